@@ -15,9 +15,10 @@ import sys
 import time
 from typing import Any, Dict, List, Optional
 
-import requests
 from dotenv import load_dotenv
 
+from importer_common import create_http_session, overall_rating
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -30,6 +31,28 @@ logging.basicConfig(
 logger = logging.getLogger('hotel_importer')
 
 
+# Shared by the dataset fetch and the API inserts
+http_session = create_http_session()
+
+# API fields copied from the dataset: API name -> (dataset name, default).
+# Fields the dataset leaves empty are not sent at all.
+HOTEL_FIELDS = {
+    'name': ('name', ''),
+    'image': ('image', ''),
+    'latitude': ('latitude', 0),
+    'longitude': ('longitude', 0),
+    'raw_ranking': ('rawRanking', 0),
+    'email': ('email', None),
+    'phone': ('phone', None),
+    'website': ('website', None),
+    'ai_reviews_summary': ('aiReviewsSummary', None),
+    'description': ('description', None),
+    'number_of_rooms': ('numberOfRooms', None),
+    'price_range': ('priceRange', None),
+    'hotel_class': ('hotelClass', None),
+}
+
+
 def fetch_hotel_data(url: str, limit: int = 100) -> List[Dict[str, Any]]:
     """
     Fetch hotel data from external API
@@ -43,7 +66,7 @@ def fetch_hotel_data(url: str, limit: int = 100) -> List[Dict[str, Any]]:
     """
     try:
         logger.info(f'Fetching data from {url}')
-        response = requests.get(url)
+        response = http_session.get(url, timeout=(3.05, 30))
         response.raise_for_status()  # Raise exception for HTTP errors
 
         data = response.json()
@@ -67,21 +90,6 @@ def process_hotel_data(hotel: Dict[str, Any], postal_code: str) -> Dict[str, Any
     Returns:
         Processed hotel data dictionary
     """
-    # Process photos (limit to 30)
-    if 'photos' in hotel and hotel['photos'] and len(hotel['photos']) > 30:
-        hotel['photos'] = hotel['photos'][:30]
-
-    # Process rating histogram - convert from object to list format
-    if 'ratingHistogram' in hotel and isinstance(hotel['ratingHistogram'], dict):
-        rh = hotel['ratingHistogram']
-        hotel['ratingHistogram'] = [
-            rh.get('count1', 0),
-            rh.get('count2', 0),
-            rh.get('count3', 0),
-            rh.get('count4', 0),
-            rh.get('count5', 0),
-        ]
-
     # Extract and clean street address
     street = ''
     if 'address' in hotel:
@@ -102,61 +110,53 @@ def process_hotel_data(hotel: Dict[str, Any], postal_code: str) -> Dict[str, Any
                 street = street[: -len(suffix)]
                 break
 
-    # Prepare data matching the API schema from hotels.py
-    hotel_data = {
-        'name': hotel.get('name', ''),
-        'image': hotel.get('image', ''),
-        'latitude': hotel.get('latitude', 0),
-        'longitude': hotel.get('longitude', 0),
-        'rawRanking': hotel.get('rawRanking', 0),
-        'ratingHistogram': hotel.get('ratingHistogram', [0, 0, 0, 0, 0]),
-        'street': street,
-        'email': hotel.get('email'),
-        'phone': hotel.get('phone'),
-        'website': hotel.get('website'),
-        'photos': hotel.get('photos', []),
-        'aiReviewsSummary': hotel.get('aiReviewsSummary'),
-        'description': hotel.get('description'),
-        'numberOfRooms': hotel.get('numberOfRooms'),
-        'priceRange': hotel.get('priceRange'),
-        'hotelClass': hotel.get('hotelClass'),
-        'features': hotel.get('amenities', []),
-        'priceLevels': [],
-    }
+    # Prepare data matching the API schema from hotels.py in one pass over
+    # the copied fields, leaving the raw hotel untouched
+    hotel_data = {}
+    for field, (source, default) in HOTEL_FIELDS.items():
+        value = hotel.get(source, default)
+        if value is not None and value != '':
+            hotel_data[field] = value
+    hotel_data['street'] = street
+    hotel_data['features'] = hotel.get('amenities', [])
+
+    # Process photos (limit to 30)
+    photos = hotel.get('photos', [])
+    hotel_data['photos'] = photos[:30] if photos else photos
+
+    # Process rating histogram - convert from object to list format
+    rh = hotel.get('ratingHistogram', [0, 0, 0, 0, 0])
+    if isinstance(rh, dict):
+        rh = [
+            rh.get('count1', 0),
+            rh.get('count2', 0),
+            rh.get('count3', 0),
+            rh.get('count4', 0),
+            rh.get('count5', 0),
+        ]
+    hotel_data['rating_histogram'] = rh
 
     # Add price level if available
-    if hotel.get('priceLevel'):
-        hotel_data['priceLevels'] = [hotel.get('priceLevel')]
+    price_level = hotel.get('priceLevel')
+    hotel_data['price_levels'] = [price_level] if price_level else []
 
     # Calculate rating from histogram if available
-    if (
-        isinstance(hotel_data['ratingHistogram'], list)
-        and len(hotel_data['ratingHistogram']) == 5
-    ):
-        rh = hotel_data['ratingHistogram']
-        total = sum(rh)
-        if total > 0:
-            calculated_rating = sum((i + 1) * rh[i] for i in range(5)) / total
-            hotel_data['rating'] = round(calculated_rating, 1)
-        else:
-            hotel_data['rating'] = 0
-    else:
-        hotel_data['rating'] = 0
+    hotel_data['rating'] = overall_rating(hotel_data['rating_histogram'])
 
     # Add city information
-    hotel_data['city'] = {'postalCode': postal_code}
+    hotel_data['city'] = {'postal_code': postal_code}
 
     return hotel_data
 
 
-def insert_hotel_via_api(
-    hotel_data: Dict[str, Any], api_url: str, token: str
+def insert_hotels_via_api(
+    hotels: List[Dict[str, Any]], api_url: str, token: str
 ) -> Optional[Dict[str, Any]]:
     """
-    Insert a hotel by making a POST request to the API
+    Insert a batch of hotels with one POST to the bulk endpoint
 
     Args:
-        hotel_data: Processed hotel data dictionary
+        hotels: Processed hotel data dictionaries
         api_url: URL of the hotels API endpoint
         token: JWT token for authorization
 
@@ -169,20 +169,22 @@ def insert_hotel_via_api(
     }
 
     try:
-        logger.info(f'Inserting hotel: {hotel_data["name"]}')
-        response = requests.post(api_url, json=hotel_data, headers=headers)
+        logger.info(f'Inserting {len(hotels)} hotels')
+        response = http_session.post(
+            f'{api_url.rstrip("/")}/bulk/', json=hotels, headers=headers
+        )
 
         if response.status_code == 201:
-            logger.info(f'Successfully inserted hotel: {hotel_data["name"]}')
+            logger.info(f'Successfully inserted batch of {len(hotels)} hotels')
             return response.json()
         else:
             logger.error(
-                f'Failed to insert hotel: {hotel_data["name"]} - Status: {response.status_code}'
+                f'Failed to insert batch of {len(hotels)} hotels - Status: {response.status_code}'
             )
             logger.error(f'Response: {response.text}')
             return None
     except Exception as e:
-        logger.error(f'Error inserting hotel {hotel_data["name"]}: {str(e)}')
+        logger.error(f'Error inserting batch of {len(hotels)} hotels: {str(e)}')
         return None
 
 
@@ -192,6 +194,7 @@ def bulk_insert_hotels(
     token: str,
     limit: int = 100,
     delay: float = 0.5,
+    batch_size: int = 100,
 ) -> Dict[str, Any]:
     """
     Fetch and insert multiple hotels via the API
@@ -201,7 +204,8 @@ def bulk_insert_hotels(
         api_url: URL of the hotels API endpoint
         token: JWT token for authorization
         limit: Maximum number of hotels to insert
-        delay: Delay between API calls in seconds
+        delay: Delay between batches in seconds
+        batch_size: Number of hotels sent per bulk request
 
     Returns:
         Dictionary with insertion statistics
@@ -218,6 +222,7 @@ def bulk_insert_hotels(
 
     inserted = 0
     errors = []
+    hotels = []
 
     for hotel in data:
         try:
@@ -226,29 +231,38 @@ def bulk_insert_hotels(
 
             # Skip hotels without required fields
             if (
-                not hotel_data['name']
-                or not hotel_data['latitude']
-                or not hotel_data['longitude']
+                not hotel_data.get('name')
+                or not hotel_data.get('latitude')
+                or not hotel_data.get('longitude')
             ):
                 errors.append(
                     f'Missing required fields for hotel: {hotel_data.get("name", "unknown")}'
                 )
                 continue
 
-            # Insert the hotel via the API
-            result = insert_hotel_via_api(hotel_data, api_url, token)
+            hotels.append(hotel_data)
+        except Exception as e:
+            errors.append(f'{hotel.get("name", "Unknown hotel")}: {str(e)}')
 
-            if result:
-                inserted += 1
-            else:
-                errors.append(f'Failed to create hotel: {hotel_data["name"]}')
+    # Insert the hotels via the bulk API, one request per batch
+    for start in range(0, len(hotels), batch_size):
+        batch = hotels[start : start + batch_size]
+        result = insert_hotels_via_api(batch, api_url, token)
 
-            # Add delay between requests to avoid overwhelming the API
-            if delay > 0:
-                time.sleep(delay)
+        if result:
+            inserted += result['created']
+            if result['skipped']:
+                errors.append(
+                    f'{result["skipped"]} hotels skipped: city {postal_code} not found'
+                )
+            for index, messages in result['errors'].items():
+                errors.append(f'{batch[int(index)]["name"]}: {messages}')
+        else:
+            errors.append(f'Failed to create batch of {len(batch)} hotels')
 
-        except Exception as e:
-            errors.append(f'{hotel.get("name", "Unknown hotel")}: {str(e)}')
+        # Add delay between requests to avoid overwhelming the API
+        if delay > 0:
+            time.sleep(delay)
 
     return {
         'success': True,
@@ -0,0 +1,49 @@
+"""
+Importer Common
+
+Helpers shared by the standalone data importers in this folder. The
+importers are run as scripts, so they import this module by its plain
+name.
+"""
+
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_http_session() -> requests.Session:
+    """
+    Create an HTTP session that keeps connections alive between calls
+
+    Idempotent requests are retried on transient gateway errors; POSTs
+    are never retried, so an insert is not sent twice.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+        ),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def overall_rating(rating_histogram: Any) -> float:
+    """
+    Average a 5-bucket rating histogram, 0 when there are no reviews
+
+    The weighted sum is unrolled instead of built with a generator.
+    """
+    if not isinstance(rating_histogram, list) or len(rating_histogram) != 5:
+        return 0
+    rh = rating_histogram
+    total = rh[0] + rh[1] + rh[2] + rh[3] + rh[4]
+    if total <= 0:
+        return 0
+    weighted = rh[0] + 2 * rh[1] + 3 * rh[2] + 4 * rh[3] + 5 * rh[4]
+    return round(weighted / total, 1)
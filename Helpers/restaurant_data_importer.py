@@ -13,11 +13,14 @@ import logging
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
 import requests
 from dotenv import load_dotenv
 
+from importer_common import create_http_session, overall_rating
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -30,6 +33,10 @@ logging.basicConfig(
 logger = logging.getLogger('restaurant_importer')
 
 
+# Shared by the dataset fetch and the API inserts
+http_session = create_http_session()
+
+
 def fetch_restaurant_data(url: str, limit: int = 100) -> List[Dict[str, Any]]:
     """
     Fetch restaurant data from external API
@@ -43,7 +50,7 @@ def fetch_restaurant_data(url: str, limit: int = 100) -> List[Dict[str, Any]]:
     """
     try:
         logger.info(f'Fetching data from {url}')
-        response = requests.get(url)
+        response = http_session.get(url, timeout=(3.05, 30))
         response.raise_for_status()  # Raise exception for HTTP errors
 
         data = response.json()
@@ -239,19 +246,9 @@ def process_restaurant_data(
             restaurant_data['priceLevels'] = parts
 
     # Calculate rating from histogram if available
-    if (
-        isinstance(restaurant_data['ratingHistogram'], list)
-        and len(restaurant_data['ratingHistogram']) == 5
-    ):
-        rh = restaurant_data['ratingHistogram']
-        total = sum(rh)
-        if total > 0:
-            calculated_rating = sum((i + 1) * rh[i] for i in range(5)) / total
-            restaurant_data['rating'] = round(calculated_rating, 1)
-        else:
-            restaurant_data['rating'] = 0
-    else:
-        restaurant_data['rating'] = 0
+    restaurant_data['rating'] = overall_rating(
+        restaurant_data['ratingHistogram']
+    )
 
     # Add city information
     restaurant_data['city'] = {'postalCode': postal_code}
@@ -260,7 +257,10 @@ def process_restaurant_data(
 
 
 def insert_restaurant_via_api(
-    restaurant_data: Dict[str, Any], api_url: str, token: str
+    restaurant_data: Dict[str, Any],
+    api_url: str,
+    token: str,
+    session: Optional[requests.Session] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     Insert a restaurant by making a POST request to the API
@@ -269,6 +269,7 @@ def insert_restaurant_via_api(
         restaurant_data: Processed restaurant data dictionary
         api_url: URL of the restaurants API endpoint
         token: JWT token for authorization
+        session: Session to send the request over, the shared one by default
 
     Returns:
         The API response if successful, None otherwise
@@ -280,7 +281,7 @@ def insert_restaurant_via_api(
 
     try:
         logger.info(f'Inserting restaurant: {restaurant_data["name"]}')
-        response = requests.post(
+        response = (session or http_session).post(
             api_url, json=restaurant_data, headers=headers
         )
 
@@ -308,6 +309,7 @@ def bulk_insert_restaurants(
     token: str,
     limit: int = 100,
     delay: float = 0.5,
+    max_workers: int = 2,
 ) -> Dict[str, Any]:
     """
     Fetch and insert multiple restaurants via the API
@@ -317,7 +319,10 @@ def bulk_insert_restaurants(
         api_url: URL of the restaurants API endpoint
         token: JWT token for authorization
         limit: Maximum number of restaurants to insert
-        delay: Delay between API calls in seconds
+        delay: Delay between API calls in seconds, per worker
+        max_workers: Number of API calls made concurrently; keep it at
+            the server's worker count (gunicorn.conf.py runs one), since
+            extra calls only queue on the server
 
     Returns:
         Dictionary with insertion statistics
@@ -337,6 +342,7 @@ def bulk_insert_restaurants(
 
     inserted = 0
     errors = []
+    restaurants = []
 
     for restaurant in data:
         try:
@@ -355,9 +361,24 @@ def bulk_insert_restaurants(
                 )
                 continue
 
-            # Insert the restaurant via the API
-            result = insert_restaurant_via_api(restaurant_data, api_url, token)
+            restaurants.append(restaurant_data)
+        except Exception as e:
+            errors.append(
+                f'{restaurant.get("name", "Unknown restaurant")}: {str(e)}'
+            )
 
+    # Insert the restaurants via the API, several at a time over the
+    # shared keep-alive session
+    def insert(restaurant_data):
+        result = insert_restaurant_via_api(restaurant_data, api_url, token)
+        # Add delay between requests to avoid overwhelming the API
+        if delay > 0:
+            time.sleep(delay)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(insert, restaurants)
+        for restaurant_data, result in zip(restaurants, results):
             if result:
                 inserted += 1
             else:
@@ -365,15 +386,6 @@ def bulk_insert_restaurants(
                     f'Failed to create restaurant: {restaurant_data["name"]}'
                 )
 
-            # Add delay between requests to avoid overwhelming the API
-            if delay > 0:
-                time.sleep(delay)
-
-        except Exception as e:
-            errors.append(
-                f'{restaurant.get("name", "Unknown restaurant")}: {str(e)}'
-            )
-
     return {
         'success': True,
         'data': {'inserted': inserted, 'errors': errors, 'total': len(data)},
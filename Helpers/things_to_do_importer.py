@@ -15,11 +15,14 @@ import os
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
 import requests
 from dotenv import load_dotenv
 
+from importer_common import create_http_session, overall_rating
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -32,6 +35,10 @@ logging.basicConfig(
 logger = logging.getLogger('things_to_do_importer')
 
 
+# Shared by the dataset fetch and the API inserts
+http_session = create_http_session()
+
+
 def read_sample_data(filename: str = 'data.txt') -> List[Dict[str, Any]]:
     """
     Read sample data from the data.txt file
@@ -84,7 +91,7 @@ def fetch_things_to_do_data(
     """
     try:
         logger.info(f'Fetching data from {url}')
-        response = requests.get(url)
+        response = http_session.get(url, timeout=(3.05, 30))
         response.raise_for_status()  # Raise exception for HTTP errors
 
         data = response.json()
@@ -194,17 +201,7 @@ def process_thing_to_do_data(
     }
 
     # Calculate rating from histogram if available
-    if isinstance(rating_histogram, list) and len(rating_histogram) == 5:
-        total = sum(rating_histogram)
-        if total > 0:
-            calculated_rating = (
-                sum((i + 1) * rating_histogram[i] for i in range(5)) / total
-            )
-            thing_to_do_data['rating'] = round(calculated_rating, 1)
-        else:
-            thing_to_do_data['rating'] = 0
-    else:
-        thing_to_do_data['rating'] = 0
+    thing_to_do_data['rating'] = overall_rating(rating_histogram)
 
     # Add city information
     thing_to_do_data['city'] = {'postalCode': postal_code}
@@ -213,7 +210,10 @@ def process_thing_to_do_data(
 
 
 def insert_thing_to_do_via_api(
-    thing_to_do_data: Dict[str, Any], api_url: str, token: str
+    thing_to_do_data: Dict[str, Any],
+    api_url: str,
+    token: str,
+    session: Optional[requests.Session] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     Insert a thing to do by making a POST request to the API
@@ -222,6 +222,7 @@ def insert_thing_to_do_via_api(
         thing_to_do_data: Processed attraction data dictionary
         api_url: URL of the things-to-do API endpoint
         token: JWT token for authorization
+        session: Session to send the request over, the shared one by default
 
     Returns:
         The API response if successful, None otherwise
@@ -233,7 +234,7 @@ def insert_thing_to_do_via_api(
 
     try:
         logger.info(f'Inserting attraction: {thing_to_do_data["name"]}')
-        response = requests.post(
+        response = (session or http_session).post(
             api_url, json=thing_to_do_data, headers=headers
         )
 
@@ -261,6 +262,7 @@ def bulk_insert_things_to_do(
     token: str,
     limit: int = 100,
     delay: float = 0.5,
+    max_workers: int = 2,
     use_sample_data: bool = False,
 ) -> Dict[str, Any]:
     """
@@ -271,7 +273,10 @@ def bulk_insert_things_to_do(
         api_url: URL of the things-to-do API endpoint
         token: JWT token for authorization
         limit: Maximum number of attractions to insert
-        delay: Delay between API calls in seconds
+        delay: Delay between API calls in seconds, per worker
+        max_workers: Number of API calls made concurrently; keep it at
+            the server's worker count (gunicorn.conf.py runs one), since
+            extra calls only queue on the server
         use_sample_data: Whether to use sample data from data.txt instead of API
 
     Returns:
@@ -297,6 +302,7 @@ def bulk_insert_things_to_do(
 
     inserted = 0
     errors = []
+    things_to_do = []
 
     for attraction in data:
         try:
@@ -321,11 +327,24 @@ def bulk_insert_things_to_do(
                 f'Processed attraction data: {json.dumps(thing_to_do_data, indent=2)}'
             )
 
-            # Insert the attraction via the API
-            result = insert_thing_to_do_via_api(
-                thing_to_do_data, api_url, token
+            things_to_do.append(thing_to_do_data)
+        except Exception as e:
+            errors.append(
+                f'{attraction.get("name", "Unknown attraction")}: {str(e)}'
             )
 
+    # Insert the attractions via the API, several at a time over the
+    # shared keep-alive session
+    def insert(thing_to_do_data):
+        result = insert_thing_to_do_via_api(thing_to_do_data, api_url, token)
+        # Add delay between requests to avoid overwhelming the API
+        if delay > 0:
+            time.sleep(delay)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(insert, things_to_do)
+        for thing_to_do_data, result in zip(things_to_do, results):
             if result:
                 inserted += 1
             else:
@@ -333,15 +352,6 @@ def bulk_insert_things_to_do(
                     f'Failed to create attraction: {thing_to_do_data["name"]}'
                 )
 
-            # Add delay between requests to avoid overwhelming the API
-            if delay > 0:
-                time.sleep(delay)
-
-        except Exception as e:
-            errors.append(
-                f'{attraction.get("name", "Unknown attraction")}: {str(e)}'
-            )
-
     return {
         'success': True,
         'data': {'inserted': inserted, 'errors': errors, 'total': len(data)},
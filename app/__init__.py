@@ -3,6 +3,7 @@ from flask import Flask
 
 from . import extensions as exts
 from .api import blueprint
+from .commands import neo4j_cli
 from .environments import (
     REDIS_DB,
     REDIS_HOST,
@@ -21,6 +22,7 @@ class AppContext:
     def init(self):
         self.app = Flask(__name__, template_folder=TEMPLATES_DIR)
         self.app.config.from_object(Config)
+        self.app.json = exts.ORJSONProvider(self.app)
 
         # Init Redis
         self.redis = redis.Redis(
@@ -44,6 +46,9 @@ class AppContext:
         # Register blueprints
         self.app.register_blueprint(blueprint)
 
+        # Register CLI commands
+        self.app.cli.add_command(neo4j_cli)
+
     def __new__(cls):
         if not cls.instance:
             cls.instance = super(AppContext, cls).__new__(cls)
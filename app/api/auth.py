@@ -1,7 +1,7 @@
-import json
 import logging
 import re
 
+import orjson
 from flask import Blueprint, request
 from flask_jwt_extended import (
     create_access_token,
@@ -129,7 +129,7 @@ def get_me():
     try:
         cached_user = redis.get(redis_key)
         if cached_user:
-            return json.loads(cached_user), 200
+            return orjson.loads(cached_user), 200
     except Exception as e:
         logger.warning('Redis is not available to get data: %s', e)
 
@@ -171,7 +171,7 @@ def get_me():
 
     # Cache the user data in Redis in 6 hours
     try:
-        redis.set(redis_key, json.dumps(response), ex=21600)
+        redis.set(redis_key, orjson.dumps(response), ex=21600)
     except Exception as e:
         logger.warning('Redis is not available to set data: %s', e)
 
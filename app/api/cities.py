@@ -25,10 +25,13 @@ class CitySchema(ma.Schema):
             raise ValidationError('Postal code must be 6 digits long')
 
 
+city_schema = CitySchema()
+cities_schema = CitySchema(many=True)
+
+
 @blueprint.post('/')
 def create_city():
-    schema = CitySchema()
-    data = schema.load(request.json)
+    data = city_schema.load(request.json)
     result = execute_neo4j_query(
         """
         MERGE (c:City {postal_code: $postal_code})
@@ -43,7 +46,7 @@ def create_city():
             'postal_code': data['postal_code'],
         },
     )
-    return schema.dump(result[0]['c']), 201
+    return city_schema.dump(result[0]['c']), 201
 
 
 @blueprint.get('/')
@@ -76,7 +79,7 @@ def get_cities():
 
     # Create paginated response
     response = create_paging(
-        data=CitySchema(many=True).dump([record['c'] for record in result]),
+        data=cities_schema.dump([record['c'] for record in result]),
         page=page,
         size=size,
         offset=offset,
@@ -99,12 +102,12 @@ def get_city_by_postal_code(postal_code):
     if not result:
         return {'error': 'City not found'}, 404
 
-    return CitySchema().dump(result[0]['c']), 200
+    return city_schema.dump(result[0]['c']), 200
 
 
 @blueprint.put('/<postal_code>/')
 def update_city(postal_code):
-    data = CitySchema().load(request.json)
+    data = city_schema.load(request.json)
     result = execute_neo4j_query(
         """
         MATCH (c:City {postal_code: $postal_code})
@@ -120,7 +123,7 @@ def update_city(postal_code):
     if not result:
         return {'error': 'City not found'}, 404
 
-    return CitySchema().dump(result[0]['c']), 200
+    return city_schema.dump(result[0]['c']), 200
 
 
 @blueprint.delete('/<postal_code>/')
@@ -1,6 +1,6 @@
-import json
 import logging
 
+import orjson
 from flask import Blueprint, request
 from google import genai
 from google.genai import types
@@ -61,7 +61,7 @@ def get_top_places(type: str):
     try:
         cached_result = redis.get(cache_key)
         if cached_result:
-            return json.loads(cached_result)
+            return orjson.loads(cached_result)
     except Exception:
         pass
 
@@ -102,7 +102,7 @@ def get_top_places(type: str):
 
     # Cache the result for 6 hours
     try:
-        redis.setex(cache_key, 21600, json.dumps(response))
+        redis.setex(cache_key, 21600, orjson.dumps(response))
     except Exception:
         pass
 
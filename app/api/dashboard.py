@@ -1,12 +1,17 @@
 import logging
 
+import orjson
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError, fields
 
 from app.extensions import ma
 from app.models import db
-from app.utils import create_paging_metadata, execute_neo4j_query
+from app.utils import (
+    create_paging_metadata,
+    execute_neo4j_queries_concurrently,
+    execute_neo4j_query,
+)
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint('dashboard', __name__, url_prefix='/dashboard')
@@ -70,15 +75,20 @@ class DashboardQuerySchema(ma.Schema):
     )
 
 
+# Schemas are stateless once built, so share one instance per module
+dashboard_query_schema = DashboardQuerySchema()
+dashboard_stats_schema = DashboardStatsSchema(many=True)
+dashboard_ranking_schema = DashboardRankingSchema(many=True)
+
+
 @blueprint.get('/statistics/places')
 @jwt_required()
 def get_places_statistics():
     """Get statistics about top places and how many times they've been added to trips."""
     try:
         # Validate query parameters
-        schema = DashboardQuerySchema()
         try:
-            args = schema.load(request.args)
+            args = dashboard_query_schema.load(request.args)
         except ValidationError as e:
             return jsonify(
                 {'error': 'Invalid parameters', 'details': e.messages}
@@ -128,8 +138,7 @@ def get_places_statistics():
         # For 'all', no additional filter needed
 
         neo4j_query = f"""
-        UNWIND $place_ids AS pid
-        MATCH (p) WHERE elementId(p) = pid {type_filter}
+        MATCH (p) WHERE elementId(p) IN $place_ids {type_filter}
         OPTIONAL MATCH (p)-[:LOCATED_IN]->(c:City)
         RETURN p AS place,
                elementId(p) AS element_id,
@@ -190,28 +199,8 @@ def get_places_statistics():
         # Apply pagination
         paginated_places = places_with_stats[offset : offset + size]
 
-        # Format city data properly
-        for place in paginated_places:
-            if place.get('city'):
-                city_data = place['city']
-                if hasattr(city_data, '__dict__'):
-                    # Convert Neo4j Node to dict
-                    place['city'] = {
-                        'created_at': city_data.get('created_at', ''),
-                        'name': city_data.get('name', ''),
-                        'postal_code': city_data.get('postal_code', ''),
-                    }
-                elif isinstance(city_data, dict):
-                    # Already a dict, ensure it has required fields
-                    place['city'] = {
-                        'created_at': city_data.get('created_at', ''),
-                        'name': city_data.get('name', ''),
-                        'postal_code': city_data.get('postal_code', ''),
-                    }
-
         # Serialize data
-        schema = DashboardStatsSchema(many=True)
-        serialized_data = schema.dump(paginated_places)
+        serialized_data = dashboard_stats_schema.dump(paginated_places)
 
         # Create paging info
         paging = create_paging_metadata(
@@ -233,9 +222,8 @@ def get_places_ranking_statistics():
     """Get statistics about top places ordered by raw_ranking with review numbers."""
     try:
         # Validate query parameters
-        schema = DashboardQuerySchema()
         try:
-            args = schema.load(request.args)
+            args = dashboard_query_schema.load(request.args)
         except ValidationError as e:
             return jsonify(
                 {'error': 'Invalid parameters', 'details': e.messages}
@@ -289,8 +277,17 @@ def get_places_ranking_statistics():
 
         neo4j_query = neo4j_query.replace('{order_clause}', order_clause)
 
-        places_data = execute_neo4j_query(
-            neo4j_query, {'offset': offset, 'limit': size}
+        # Total count for pagination
+        count_query = f"""
+        MATCH (p) WHERE ({type_filter})
+        AND p.raw_ranking IS NOT NULL
+        RETURN COUNT(p) AS total_count
+        """
+
+        # Run the page and count queries side by side
+        places_data, count_result = execute_neo4j_queries_concurrently(
+            (neo4j_query, {'offset': offset, 'limit': size}),
+            (count_query, {}),
         )
 
         if not places_data:
@@ -328,39 +325,11 @@ def get_places_ranking_statistics():
 
             places_with_reviews.append(place)
 
-        # Get total count for pagination (separate query)
-        count_query = f"""
-        MATCH (p) WHERE ({type_filter})
-        AND p.raw_ranking IS NOT NULL
-        RETURN COUNT(p) AS total_count
-        """
-
-        count_result = execute_neo4j_query(count_query, {})
         total_count = count_result[0]['total_count'] if count_result else 0
         page_count = (total_count + size - 1) // size if total_count > 0 else 1
 
-        # Format city data properly
-        for place in places_with_reviews:
-            if place.get('city'):
-                city_data = place['city']
-                if hasattr(city_data, '__dict__'):
-                    # Convert Neo4j Node to dict
-                    place['city'] = {
-                        'created_at': city_data.get('created_at', ''),
-                        'name': city_data.get('name', ''),
-                        'postal_code': city_data.get('postal_code', ''),
-                    }
-                elif isinstance(city_data, dict):
-                    # Already a dict, ensure it has required fields
-                    place['city'] = {
-                        'created_at': city_data.get('created_at', ''),
-                        'name': city_data.get('name', ''),
-                        'postal_code': city_data.get('postal_code', ''),
-                    }
-
         # Serialize data
-        schema = DashboardRankingSchema(many=True)
-        serialized_data = schema.dump(places_with_reviews)
+        serialized_data = dashboard_ranking_schema.dump(places_with_reviews)
 
         # Create paging info
         paging = create_paging_metadata(
@@ -451,7 +420,6 @@ def get_dashboard_summary():
 def get_monthly_user_statistics():
     """Get statistics about the number of users created each month this year."""
     try:
-        import json
         from datetime import datetime
 
         from flask import Response
@@ -535,7 +503,7 @@ def get_monthly_user_statistics():
         monthly_stats['total_user'] = total_users
 
         # Return JSON response with preserved order
-        response_json = json.dumps(monthly_stats, separators=(',', ':'))
+        response_json = orjson.dumps(monthly_stats)
         return Response(response_json, content_type='application/json'), 200
 
     except Exception as e:
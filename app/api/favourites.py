@@ -3,11 +3,20 @@ import logging
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import fields
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.extensions import ma
 from app.models import UserFavourite, db
-from app.utils import execute_neo4j_query, update_user_preference_cache
+from app.utils import (
+    compile_dumper,
+    create_paging,
+    execute_neo4j_query,
+    invalidate_favourite_ids,
+    json_response,
+    run_in_background,
+    update_user_preference_cache,
+)
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint('favourites', __name__, url_prefix='/favourites')
@@ -35,23 +44,57 @@ class ShortPlaceSchema(ma.Schema):
     type = fields.String(dump_only=True)
 
 
+# The listing is dumped through a dumper compiled from the schema
+_dump_short_place = compile_dumper(ShortPlaceSchema())
+
+
 @blueprint.get('/')
 @jwt_required()
 def get_favourites():
     user_id = get_jwt_identity()
-    query = 'SELECT place_id FROM user_favourites WHERE user_id = :user_id ORDER BY created_at DESC'
-
-    result = db.session.execute(db.text(query), {'user_id': user_id})
-    place_ids = [row.place_id for row in result]
+    page = request.args.get('page', default=1, type=int)
+    size = request.args.get('size', default=10, type=int)
+
+    # Validate pagination parameters
+    if page < 1:
+        return jsonify({'error': 'Page must be greater than 0'}), 400
+    if size < 1:
+        return jsonify({'error': 'Size must be greater than 0'}), 400
+
+    offset = (page - 1) * size
+
+    # Fetch only the requested page, with the total in the same round trip
+    query = (
+        'SELECT place_id, COUNT(*) OVER () AS total_count '
+        'FROM user_favourites WHERE user_id = :user_id '
+        'ORDER BY created_at DESC LIMIT :size OFFSET :offset'
+    )
+    rows = db.session.execute(
+        db.text(query), {'user_id': user_id, 'size': size, 'offset': offset}
+    ).all()
+    place_ids = [row.place_id for row in rows]
 
-    # If no favourites, return empty list
+    # If no favourites on this page, return an empty page
     if not place_ids:
-        return jsonify([]), 200
+        total_count = db.session.execute(
+            db.text(
+                'SELECT COUNT(*) FROM user_favourites WHERE user_id = :user_id'
+            ),
+            {'user_id': user_id},
+        ).scalar()
+        return json_response(
+            create_paging(
+                data=[],
+                page=page,
+                size=size,
+                offset=offset,
+                total_count=total_count,
+            )
+        )
 
     # Query Neo4j for place details
     neo4j_query = """
-    UNWIND $place_ids AS pid
-    MATCH (p) WHERE elementId(p) = pid
+    MATCH (p) WHERE elementId(p) IN $place_ids
     OPTIONAL MATCH (p)-[:LOCATED_IN]->(c:City)
     RETURN p AS place, elementId(p) AS element_id, c AS city
     """
@@ -61,17 +104,26 @@ def get_favourites():
     if not neo4j_result:
         neo4j_result = []
 
-    # Prepare data for serialization
-    places = []
+    # Prepare data for serialization, keeping the most recent first
+    places_by_id = {}
     for record in neo4j_result:
         place = record['place']
         place['element_id'] = record['element_id']
         place['is_favorite'] = True
         if record.get('city'):
             place['city'] = record['city']
-        places.append(place)
-
-    return jsonify(ShortPlaceSchema(many=True).dump(places)), 200
+        places_by_id[record['element_id']] = place
+    places = [places_by_id[pid] for pid in place_ids if pid in places_by_id]
+
+    return json_response(
+        create_paging(
+            data=[_dump_short_place(place) for place in places],
+            page=page,
+            size=size,
+            offset=offset,
+            total_count=rows[0].total_count,
+        )
+    )
 
 
 class RequestSchema(ma.Schema):
@@ -87,21 +139,22 @@ def add_favourite():
     if not place_id:
         return jsonify({'error': 'place_id is required'}), 400
 
-    # Check if already exists
-    existing_favourite = (
-        db.session.query(UserFavourite)
-        .filter_by(user_id=user_id, place_id=place_id)
-        .first()
-    )
-    if existing_favourite:
+    # Insert unless the favourite already exists, in a single statement
+    inserted = db.session.execute(
+        pg_insert(UserFavourite)
+        .values(user_id=user_id, place_id=place_id)
+        .on_conflict_do_nothing(index_elements=['user_id', 'place_id'])
+        .returning(UserFavourite.id)
+    ).first()
+    db.session.commit()
+
+    if not inserted:
         return {'error': 'Place already in favourites'}, 400
 
-    favourite = UserFavourite(user_id=user_id, place_id=place_id)
-    db.session.add(favourite)
-    db.session.commit()
+    invalidate_favourite_ids(user_id)
 
-    # Update user recommendation cache
-    update_user_preference_cache(user_id)
+    # Update user recommendation cache without blocking the response
+    run_in_background(update_user_preference_cache, user_id)
 
     return {'success': True}, 201
 
@@ -113,21 +166,24 @@ def delete_favourite(place_id):
     user_id = get_jwt_identity()
 
     try:
-        # Find and delete the favourite
-        favourite = (
-            db.session.query(UserFavourite)
-            .filter_by(user_id=user_id, place_id=place_id)
-            .first()
-        )
+        # Delete the favourite in a single round trip
+        deleted = db.session.execute(
+            db.text(
+                'DELETE FROM user_favourites '
+                'WHERE user_id = :user_id AND place_id = :place_id '
+                'RETURNING 1'
+            ),
+            {'user_id': user_id, 'place_id': place_id},
+        ).first()
+        db.session.commit()
 
-        if not favourite:
+        if not deleted:
             return jsonify({'error': 'Place not found in favourites'}), 404
 
-        db.session.delete(favourite)
-        db.session.commit()
+        invalidate_favourite_ids(user_id)
 
-        # Update user recommendation cache
-        update_user_preference_cache(user_id)
+        # Update user recommendation cache without blocking the response
+        run_in_background(update_user_preference_cache, user_id)
 
         return jsonify(
             {'message': 'Place removed from favourites successfully'}
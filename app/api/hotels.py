@@ -1,25 +1,180 @@
-import json
+import base64
+import functools
+import itertools
 import logging
+import re
+from datetime import datetime
 
+import orjson
 from flask import Blueprint, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import ValidationError, fields, pre_load, validates
 
+from app.environments import TIMEZONE
 from app.extensions import ma
-from app.models import UserFavourite, db
 from app.utils import (
+    acquire_cache_lock,
+    bump_cache_version,
+    conditional_response,
+    compile_dumper,
     create_paging,
     delete_place_and_related_data,
     execute_neo4j_query,
+    execute_neo4j_read,
+    execute_neo4j_write,
     get_all_hotel_features,
+    get_favourite_ids,
     get_redis,
+    get_versioned_cache,
+    json_body_response,
+    json_response,
+    listing_response,
+    overall_rating,
+    release_cache_lock,
+    run_in_background,
+    store_listing,
+    submit_neo4j_query,
+    wait_for_cache,
 )
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint('hotels', __name__, url_prefix='/hotels')
 
+# Listed hotel shaped server-side as one map, so rows need no reshaping.
+# The price bounds are named so a missing max_price still comes back null.
+HOTEL_LIST_PROJECTION = """h {
+    .*,
+    .min_price,
+    .max_price,
+    element_id: elementId(h),
+    price_levels: [(h)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel) | pl.level],
+    city: head([(h)-[:LOCATED_IN]->(c:City) | c]),
+    hotel_class: head([(h)-[:BELONGS_TO_CLASS]->(hc:HotelClass) | hc.name]),
+    features: [(h)-[:HAS_FEATURE]->(f:Feature) | f.name]
+}"""
+
+# Count and page of the unfiltered listing in one query. The page is
+# collected inside a subquery so the total is returned even when the page
+# is empty.
+_ALL_HOTELS_TEMPLATE = """
+MATCH (all_hotels:Hotel)
+WITH count(all_hotels) AS total_count
+CALL {{
+    MATCH (h:Hotel){page_filter}
+    WITH h
+    ORDER BY h.raw_ranking DESC, elementId(h)
+    SKIP $offset
+    LIMIT $size
+    RETURN collect({projection}) AS rows
+}}
+RETURN total_count, rows
+"""
+ALL_HOTELS_QUERY = _ALL_HOTELS_TEMPLATE.format(
+    page_filter='', projection=HOTEL_LIST_PROJECTION
+)
+ALL_HOTELS_AFTER_CURSOR_QUERY = _ALL_HOTELS_TEMPLATE.format(
+    page_filter="""
+    WHERE h.raw_ranking < $after_ranking
+        OR (h.raw_ranking = $after_ranking AND elementId(h) > $after_id)""",
+    projection=HOTEL_LIST_PROJECTION,
+)
+
+# Count and page of the hotels matched before it, in one query. The
+# matches are collected once so the total and the slice come from the
+# same round trip, and an empty page still returns the total.
+_MATCHED_HOTELS_PAGE = f"""
+WITH h
+ORDER BY h.raw_ranking DESC
+WITH collect(h) AS matched
+RETURN
+    size(matched) AS total_count,
+    [h IN matched[$offset..$offset + $size] | {HOTEL_LIST_PROJECTION}] AS rows
+"""
+
+SEARCH_HOTELS_QUERY = f"""
+MATCH (h:Hotel)
+WHERE toLower(h.name) CONTAINS toLower($search)
+{_MATCHED_HOTELS_PAGE}
+"""
+
+# The detail view needs the same related data as a listed hotel
+HOTEL_DETAIL_QUERY = f"""
+MATCH (h:Hotel)
+WHERE elementId(h) = $hotel_id
+RETURN {HOTEL_LIST_PROJECTION} AS hotel
+"""
+
+
+def _filter_hotel_query(has_hotel_class, has_price, has_rating, has_features):
+    """
+    Build the count and page query for a combination of hotel filters.
+
+    Only the presence of each filter changes the text, so there are at
+    most 16 variants; all of them are built at import time.
+    """
+    if has_hotel_class:
+        # Start with hotel_class relationship match
+        base_match = """
+        MATCH (h:Hotel)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
+        WHERE hc.name = $hotel_class
+        """
+    else:
+        base_match = 'MATCH (h:Hotel)'
+
+    # Add other filter conditions
+    additional_filters = []
+    if has_price:
+        additional_filters.append(
+            'h.min_price <= $price AND $price <= h.max_price'
+        )
+    if has_rating:
+        additional_filters.append('h.rating >= $rating')
+    if has_features:
+        additional_filters.append(
+            'ALL(f_name IN $features WHERE (h)-[:HAS_FEATURE]->(:Feature {name: f_name}))'
+        )
+
+    # Build WHERE clause for additional filters
+    if additional_filters:
+        keyword = 'AND' if has_hotel_class else 'WHERE'
+        additional_where = f'{keyword} {" AND ".join(additional_filters)}'
+    else:
+        additional_where = ''
+
+    return f"""
+    {base_match}
+    {additional_where}
+    {_MATCHED_HOTELS_PAGE}
+    """
+
+
+# Filter queries keyed by (has_hotel_class, has_price, has_rating,
+# has_features)
+FILTER_HOTEL_QUERIES = {
+    flags: _filter_hotel_query(*flags)
+    for flags in itertools.product((False, True), repeat=4)
+}
+
+
+# List caches are keyed by a generation number; bumping it orphans every
+# cached page at once and the stale entries expire through their TTL
+HOTEL_CACHE_NAMESPACE = 'hotels'
+
+# Unversioned copy of each listing page, served while a page is rebuilt
+HOTEL_STALE_TTL = 86400
+
+# Listing pages rebuilt ahead of visitors after hotels change
+HOTEL_WARM_PAGES = 3
+
+
+# Patterns for "$101+" and "$1 - $25" style price ranges
+_PRICE_PLUS_RE = re.compile(r'\$(\d+)\+')
+_PRICE_DOLLAR_RE = re.compile(r'\$(\d+)')
 
-# Add utility function to extract price range from string
+
+# Add utility function to extract price range from string. Only a handful
+# of distinct range strings exist, so results are memoised.
+@functools.lru_cache(maxsize=256)
 def extract_price_range(price_range_str):
     """
     Extract min_price and max_price from price_range string.
@@ -32,19 +187,17 @@ def extract_price_range(price_range_str):
     if not price_range_str:
         return None, None
 
-    import re
-
     # Remove extra spaces and convert to lower
     price_str = price_range_str.strip()
 
     # Handle "$101+" format
     if '+' in price_str:
-        match = re.search(r'\$(\d+)\+', price_str)
+        match = _PRICE_PLUS_RE.search(price_str)
         if match:
             return int(match.group(1)), None
 
     # Handle "$1 - $25" format
-    matches = re.findall(r'\$(\d+)', price_str)
+    matches = _PRICE_DOLLAR_RE.findall(price_str)
     if len(matches) >= 2:
         return int(matches[0]), int(matches[1])
     elif len(matches) == 1:
@@ -53,25 +206,7 @@ def extract_price_range(price_range_str):
     return None, None
 
 
-# Add utility function to add min_price and max_price to hotel data
-def add_price_fields_to_hotels(hotels_data):
-    """Add min_price and max_price fields to hotel data based on Neo4j properties or price_range."""
-    for hotel in hotels_data:
-        # First check if min_price and max_price are already in the hotel data from Neo4j
-        if 'min_price' not in hotel or hotel.get('min_price') is None:
-            # Fallback to extracting from price_range string
-            price_range = hotel.get('price_range')
-            min_price, max_price = extract_price_range(price_range)
-            hotel['min_price'] = min_price
-            hotel['max_price'] = max_price
-        # If min_price exists but max_price doesn't, ensure both are set consistently
-        elif 'max_price' not in hotel or hotel.get('max_price') is None:
-            # If only min_price is available, try to extract max_price from price_range
-            price_range = hotel.get('price_range')
-            extracted_min, extracted_max = extract_price_range(price_range)
-            # Keep the existing min_price from Neo4j, but use extracted max_price if available
-            hotel['max_price'] = extracted_max
-    return hotels_data
+CITY_NOT_FOUND_MESSAGE = 'City with this postal code does not exist'
 
 
 class AttachCitySchema(ma.Schema):
@@ -81,19 +216,6 @@ class AttachCitySchema(ma.Schema):
 
     postal_code = fields.String(required=True)
 
-    @validates('postal_code')
-    def validate_postal_code(self, value: str):
-        result = execute_neo4j_query(
-            """
-            MATCH (c:City {postal_code: $postal_code})
-            RETURN c
-            """,
-            {'postal_code': value},
-        )
-        if not result:
-            raise ValidationError('City with this postal code does not exist')
-        return value
-
 
 class ShortHotelSchema(ma.Schema):
     created_at = fields.String(dump_only=True)
@@ -118,9 +240,6 @@ class ShortHotelSchema(ma.Schema):
     type = fields.String(dump_only=True)
     is_favorite = fields.Boolean(dump_only=True, default=False)
 
-    def on_bind_field(self, field_name, field_obj):
-        super().on_bind_field(field_name, field_obj)
-
     @validates('rating')
     def validate_rating(self, value: float):
         if value is not None and (value < 0 or value > 5):
@@ -133,7 +252,8 @@ class ShortHotelSchema(ma.Schema):
             raise ValidationError(
                 'Rating histogram must contain exactly 5 integers'
             )
-        if value and not all(isinstance(i, int) and i >= 0 for i in value):
+        # fields.Integer has already coerced the elements to int
+        if value and min(value) < 0:
             raise ValidationError(
                 'Rating histogram must be a list of 5 non-negative integers'
             )
@@ -152,20 +272,9 @@ class ShortHotelSchema(ma.Schema):
             data['rating'] = 0
 
         # Calculate rating from histogram if available
-        if (
-            'rating_histogram' in data
-            and isinstance(data['rating_histogram'], list)
-            and len(data['rating_histogram']) == 5
-        ):
-            rh = data['rating_histogram']
-            total = sum(rh)
-            if total > 0:
-                calculated_rating = (
-                    sum((i + 1) * rh[i] for i in range(5)) / total
-                )
-                data['rating'] = round(calculated_rating, 1)
-            else:
-                data['rating'] = 0
+        rating_histogram = data['rating_histogram']
+        if isinstance(rating_histogram, list) and len(rating_histogram) == 5:
+            data['rating'] = overall_rating(rating_histogram)
 
         return data
 
@@ -192,6 +301,14 @@ class HotelSchema(ShortHotelSchema):
         return value
 
 
+short_hotel_schema = ShortHotelSchema()
+hotel_schema = HotelSchema()
+
+
+# Listing pages are dumped through a dumper compiled from the schema
+_dump_short_hotel = compile_dumper(short_hotel_schema)
+
+
 @blueprint.get('/features/')
 def get_features():
     """Get all available features (amenities) for hotels."""
@@ -199,113 +316,104 @@ def get_features():
     return {'features': features}, 200
 
 
-@blueprint.post('/')
-def create_hotel():
-    data = HotelSchema().load(request.get_json())
-    city_postal_code = data['city']['postal_code']
-
-    # Get data with defaults for empty lists
-    features = data.get('features', [])
-    price_levels = data.get('price_levels', [])
-
-    # Base query to create hotel
-    query = """
-    MATCH (c:City {postal_code: $postal_code})
-    CREATE
-        (h:Hotel
-            {
-                name: $name,
-                image: $image,
-                latitude: $latitude,
-                longitude: $longitude,
-                photos: $photos,
-                rating: $rating,
-                rating_histogram: $rating_histogram,
-                raw_ranking: $raw_ranking,
-                ai_reviews_summary: $ai_reviews_summary,
-                description: $description,
-                email: $email,
-                number_of_rooms: $number_of_rooms,
-                phone: $phone,
-                street: $street,
-                type: 'HOTEL',
-                website: $website,
-                price_range: $price_range,
-                created_at:
-                    apoc.date.format(timestamp(), 'ms', 'yyyy-MM-dd HH:mm', 'GMT+7')
-            })
-    MERGE (h)-[:LOCATED_IN]->(c)
-    """
-
-    # Add features relationship if features list is not empty
-    if features:
-        query += """
-        WITH h, c
-        UNWIND $features AS feature_name
-        MERGE (a:Feature {name: feature_name})
-        MERGE (h)-[:HAS_FEATURE]->(a)
-        """
+# Creates the hotels of $hotels, rows built by _hotel_row(), in one query.
+# The text is the same for every payload so Neo4j reuses its cached plan,
+# and each node is carried through the relationship clauses instead of
+# being matched again. Rows whose city does not exist are skipped by the
+# MATCH; empty lists and a null class make the FOREACH clauses no-ops.
+_CREATE_HOTELS_TEMPLATE = """
+UNWIND $hotels AS row
+MATCH (c:City {{postal_code: row.postal_code}})
+CREATE (h:Hotel)
+SET h = row.properties, h.type = 'HOTEL', h.created_at = $created_at
+MERGE (h)-[:LOCATED_IN]->(c)
+FOREACH (feature_name IN row.features |
+    MERGE (a:Feature {{name: feature_name}})
+    MERGE (h)-[:HAS_FEATURE]->(a)
+)
+FOREACH (price_level IN row.price_levels |
+    MERGE (pl:PriceLevel {{level: price_level}})
+    MERGE (h)-[:HAS_PRICE_LEVEL]->(pl)
+)
+FOREACH (class_name IN CASE
+        WHEN row.hotel_class IS NULL THEN []
+        ELSE [row.hotel_class]
+    END |
+    MERGE (hc:HotelClass {{name: class_name}})
+    MERGE (h)-[:BELONGS_TO_CLASS]->(hc)
+)
+{returns}
+"""
 
-    # Add price_levels relationship if price_levels list is not empty
-    if price_levels:
-        query += """
-        WITH h, c
-        UNWIND $price_levels AS price_level
-        MERGE (pl:PriceLevel {level: price_level})
-        MERGE (h)-[:HAS_PRICE_LEVEL]->(pl)
-        """
+CREATE_HOTEL_QUERY = _CREATE_HOTELS_TEMPLATE.format(
+    returns='RETURN h, elementId(h) AS element_id, c'
+)
 
-    # Add hotel class relationship if hotel_class is provided
-    if data.get('hotel_class'):
-        query += """
-        WITH h, c
-        MERGE (hc:HotelClass {name: $hotel_class})
-        MERGE (h)-[:BELONGS_TO_CLASS]->(hc)
-        """
+BULK_CREATE_HOTELS_QUERY = _CREATE_HOTELS_TEMPLATE.format(
+    returns='RETURN count(h) AS created'
+)
 
-    # Finalize query to return data
-    query += """
-    RETURN
-        h,
-        elementId(h) AS element_id,
-        c
-    """
 
-    # Execute the Neo4j query
-    result = execute_neo4j_query(
-        query,
-        {
-            'postal_code': city_postal_code,
+def _hotel_row(data):
+    """Turn a loaded hotel into the row the create queries write."""
+    min_price, max_price = extract_price_range(data.get('price_range'))
+    return {
+        'postal_code': data['city']['postal_code'],
+        'properties': {
             'name': data['name'],
             'image': data['image'],
             'latitude': data['latitude'],
             'longitude': data['longitude'],
             'photos': data.get('photos', []),
-            'price_levels': price_levels,
             'rating': data.get('rating'),
             'rating_histogram': data.get('rating_histogram', []),
             'raw_ranking': data['raw_ranking'],
             'ai_reviews_summary': data.get('ai_reviews_summary'),
             'description': data.get('description'),
             'email': data.get('email'),
+            'number_of_rooms': data.get('number_of_rooms'),
             'phone': data.get('phone'),
+            'street': data['street'],
             'website': data.get('website'),
-            'number_of_rooms': data.get('number_of_rooms'),
-            'hotel_class': data.get('hotel_class'),
             'price_range': data.get('price_range'),
-            'features': features,
-            'street': data['street'],
+            'min_price': min_price,
+            'max_price': max_price,
+        },
+        'features': data.get('features', []),
+        'price_levels': data.get('price_levels', []),
+        'hotel_class': data.get('hotel_class') or None,
+    }
+
+
+@blueprint.post('/')
+def create_hotel():
+    data = hotel_schema.load(request.get_json())
+
+    # Execute the Neo4j query as a one-row batch; price bounds are stored
+    # with the hotel so the filters and listings never parse price_range on
+    # read
+    result = execute_neo4j_write(
+        CREATE_HOTEL_QUERY,
+        {
+            'hotels': [_hotel_row(data)],
+            # Formatted here so the write is a plain property assignment
+            'created_at': datetime.now(TIMEZONE).strftime('%Y-%m-%d %H:%M'),
         },
     )
 
+    # The query only creates the hotel when it matches the city, so no
+    # row means the postal code is unknown
     if not result:
-        return {'error': 'Failed to create hotel.'}, 400
+        raise ValidationError(
+            {'city': {'postal_code': [CITY_NOT_FOUND_MESSAGE]}}
+        )
 
-    # Delete cached hotel data
-    redis = get_redis()
-    keys_to_delete = redis.keys('hotels:*')
-    if keys_to_delete:
-        redis.delete(*keys_to_delete)
+    # Invalidate cached hotel lists and rebuild the first pages
+    try:
+        bump_cache_version(HOTEL_CACHE_NAMESPACE)
+        run_in_background(warm_hotel_listing)
+    except Exception as e:
+        logger.warning('Redis is not available to set data: %s', e)
 
     hotel = result[0]['h']
     hotel['element_id'] = result[0]['element_id']
@@ -316,9 +424,71 @@ def create_hotel():
         hotel['hotel_class'] = data['hotel_class']
 
     # Add price_levels to the response
-    hotel['price_levels'] = price_levels
+    hotel['price_levels'] = data.get('price_levels', [])
+
+    return short_hotel_schema.dump(hotel), 201
+
+
+# Hotels created per query by the bulk endpoint
+BULK_CREATE_BATCH_SIZE = 500
 
-    return ShortHotelSchema().dump(hotel), 201
+# Most hotels the bulk endpoint accepts in one request
+BULK_CREATE_MAX_HOTELS = 1000
+
+
+@blueprint.post('/bulk/')
+@jwt_required()
+def bulk_create_hotels():
+    """
+    Create many hotels at once.
+
+    Each hotel is validated on its own, so an invalid hotel is reported
+    by its index without failing the others. Valid hotels are written
+    BULK_CREATE_BATCH_SIZE at a time, one query per batch. Hotels whose
+    city does not exist are skipped and counted.
+    """
+    payload = request.get_json()
+    if not isinstance(payload, list):
+        return {'error': 'Expected a list of hotels'}, 400
+    if len(payload) > BULK_CREATE_MAX_HOTELS:
+        return {
+            'error': f'At most {BULK_CREATE_MAX_HOTELS} hotels can be '
+            'created at once'
+        }, 400
+
+    rows = []
+    errors = {}
+    for index, item in enumerate(payload):
+        try:
+            rows.append(_hotel_row(hotel_schema.load(item)))
+        except ValidationError as e:
+            errors[str(index)] = e.messages
+    created_at = datetime.now(TIMEZONE).strftime('%Y-%m-%d %H:%M')
+
+    created = 0
+    for start in range(0, len(rows), BULK_CREATE_BATCH_SIZE):
+        result = execute_neo4j_write(
+            BULK_CREATE_HOTELS_QUERY,
+            {
+                'hotels': rows[start : start + BULK_CREATE_BATCH_SIZE],
+                'created_at': created_at,
+            },
+        )
+        created += result[0]['created'] if result else 0
+
+    # Invalidate cached hotel lists and rebuild the first pages
+    if created:
+        try:
+            bump_cache_version(HOTEL_CACHE_NAMESPACE)
+            run_in_background(warm_hotel_listing)
+        except Exception as e:
+            logger.warning('Redis is not available to set data: %s', e)
+
+    return {
+        'created': created,
+        'skipped': len(rows) - created,
+        'errors': errors,
+    }, 201
 
 
 @blueprint.get('/')
@@ -329,6 +499,20 @@ def get_hotels():
     size = request.args.get('size', default=10, type=int)
     offset = (page - 1) * size
 
+    # Keyset cursor from the previous page's next_cursor, used instead of
+    # page/offset when listing all hotels
+    cursor = None
+    cursor_token = request.args.get('cursor', type=str)
+    if cursor_token:
+        cursor = _decode_cursor(cursor_token)
+        if cursor is None:
+            return {'error': 'Invalid cursor'}, 400
+    else:
+        after_ranking = request.args.get('after_ranking', type=float)
+        after_id = request.args.get('after_id', type=str)
+        if after_ranking is not None and after_id:
+            cursor = (after_ranking, after_id)
+
     # Get search parameter
     search = request.args.get('search', default='', type=str)
 
@@ -374,7 +558,7 @@ def get_hotels():
 
     if not is_search_mode and not is_filter_mode:
         # Default behavior: return all hotels
-        return _get_all_hotels(page, size, offset, user_id)
+        return _get_all_hotels(page, size, offset, user_id, cursor)
     elif is_search_mode:
         return _search_hotels(search, page, size, offset, user_id)
     else:
@@ -391,162 +575,164 @@ def get_hotels():
         )
 
 
-def _get_all_hotels(page, size, offset, user_id):
-    """Get all hotels with pagination (default behavior)."""
-    # Check if the result is cached
-    redis = get_redis()
-    cache_key = f'hotels:page={page}:size={size}:all'
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            hotels = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                hotel_ids = [hotel['element_id'] for hotel in hotels['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(hotel_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for hotel in hotels['data']:
-                    hotel['is_favorite'] = hotel['element_id'] in favourite_ids
-            else:
-                for hotel in hotels['data']:
-                    hotel['is_favorite'] = False
-            return hotels, 200
-    except Exception as e:
-        logger.warning('Redis is not available to get data: %s', e)
+def _cached_hotels_response(cached_response, user_id):
+    """Build a listing response from a serialized page for the user."""
+    return conditional_response(listing_response(cached_response, user_id))
+
+
+def _store_hotel_page(cache_key, stale_key, lock_token, payload):
+    """Cache a rebuilt listing page, keep a stale copy, release the lock."""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.set(cache_key, payload, ex=21600)
+    pipe.set(stale_key, payload, ex=HOTEL_STALE_TTL)
+    pipe.execute()
+    if lock_token:
+        release_cache_lock(cache_key, lock_token)
+
+
+def _store_hotel_detail(cache_key, lock_token, payload):
+    """Cache a rebuilt hotel detail and release the lock."""
+    get_redis().set(cache_key, payload, ex=21600)
+    if lock_token:
+        release_cache_lock(cache_key, lock_token)
+
+
+def warm_hotel_listing(pages=HOTEL_WARM_PAGES, size=10):
+    """Rebuild the first listing pages so visitors do not pay the miss."""
+    for page in range(1, pages + 1):
+        _get_all_hotels(page, size, (page - 1) * size, None)
 
-    # Create Cypher query parameters
-    query_params = {'offset': offset, 'size': size}
 
-    # Get the total count of all hotels
-    count_query = """
-    MATCH (h:Hotel)
-    RETURN count(h) AS total_count
+def _encode_cursor(raw_ranking, element_id):
+    """Encode the last hotel of a page as an opaque listing cursor."""
+    token = f'{raw_ranking}:{element_id}'.encode()
+    return base64.urlsafe_b64encode(token).decode()
+
+
+def _decode_cursor(token):
     """
+    Decode a listing cursor into ``(raw_ranking, element_id)``.
 
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = total_count_result[0]['total_count']
-
-    # Get all hotels with pagination
-    hotels_query = """
-    MATCH (h:Hotel)
-    OPTIONAL MATCH (h)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-    OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (h)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
-    OPTIONAL MATCH (h)-[:HAS_FEATURE]->(f:Feature)
-    RETURN h, elementId(h) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, hc.name AS hotel_class, collect(DISTINCT f.name) AS features
-    ORDER BY h.raw_ranking DESC
-    SKIP $offset
-    LIMIT $size
+    Returns None if the cursor is malformed.
     """
+    try:
+        decoded = base64.urlsafe_b64decode(token.encode()).decode()
+        # Element ids contain colons, the ranking never does
+        raw_ranking, _, element_id = decoded.partition(':')
+        cursor = (float(raw_ranking), element_id)
+    except ValueError:
+        return None
 
-    result = execute_neo4j_query(hotels_query, query_params)
+    return cursor if cursor[1] else None
 
-    # Process results - now includes price fields
-    hotels_data = _process_hotel_results(result, user_id)
 
-    # Create paginated response
-    response = create_paging(
-        data=ShortHotelSchema(many=True).dump(hotels_data),
+def _hotel_page_response(result, page, size, offset):
+    """Create the paginated response from a count-and-page query result."""
+    dump = _dump_short_hotel
+    return create_paging(
+        data=[dump(hotel) for hotel in result[0]['rows']],
         page=page,
         size=size,
         offset=offset,
-        total_count=total_count,
+        total_count=result[0]['total_count'],
     )
 
-    # Cache the response for 6 hours
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
 
-    return response, 200
+def _get_all_hotels(page, size, offset, user_id, cursor=None):
+    """
+    Get all hotels with pagination (default behavior).
 
+    With a (raw_ranking, element_id) cursor the page starts right after
+    that hotel, so Neo4j seeks into the raw_ranking index instead of
+    skipping offset rows.
+    """
+    if cursor is None:
+        page_key = f'page={page}'
+        hotels_query = ALL_HOTELS_QUERY
+        query_params = {'offset': offset, 'size': size}
+    else:
+        page_key = f'after={cursor[0]}:{cursor[1]}'
+        hotels_query = ALL_HOTELS_AFTER_CURSOR_QUERY
+        query_params = {
+            'offset': 0,
+            'size': size,
+            'after_ranking': cursor[0],
+            'after_id': cursor[1],
+        }
 
-def _search_hotels(search, page, size, offset, user_id):
-    """Search hotels by name."""
     # Check if the result is cached
     redis = get_redis()
-    cache_key = f'hotels:page={page}:size={size}:search={search}'
+    cache_key, cached_response = get_versioned_cache(
+        HOTEL_CACHE_NAMESPACE, f'{page_key}:size={size}:all'
+    )
     try:
-        cached_response = redis.get(cache_key)
         if cached_response:
-            hotels = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                hotel_ids = [hotel['element_id'] for hotel in hotels['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(hotel_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for hotel in hotels['data']:
-                    hotel['is_favorite'] = hotel['element_id'] in favourite_ids
-            else:
-                for hotel in hotels['data']:
-                    hotel['is_favorite'] = False
-            return hotels, 200
+            return _cached_hotels_response(cached_response, user_id)
     except Exception as e:
         logger.warning('Redis is not available to get data: %s', e)
 
-    # Create Cypher query parameters
-    query_params = {'offset': offset, 'size': size, 'search': search}
-
-    # Get the total count of hotels matching the search criteria
-    count_query = """
-    MATCH (h:Hotel)
-    WHERE toLower(h.name) CONTAINS toLower($search)
-    RETURN count(h) AS total_count
-    """
-
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = total_count_result[0]['total_count']
-
-    # Get the hotels with pagination and search filter
-    hotels_query = """
-    MATCH (h:Hotel)
-    WHERE toLower(h.name) CONTAINS toLower($search)
-    OPTIONAL MATCH (h)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-    OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (h)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
-    OPTIONAL MATCH (h)-[:HAS_FEATURE]->(f:Feature)
-    RETURN h, elementId(h) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, hc.name AS hotel_class, collect(DISTINCT f.name) AS features
-    ORDER BY h.raw_ranking DESC
-    SKIP $offset
-    LIMIT $size
-    """
+    # Only one worker rebuilds a missing page; concurrent requests serve
+    # the last good copy meanwhile, or wait for the rebuilt page, instead
+    # of all hitting Neo4j
+    stale_key = f'{HOTEL_CACHE_NAMESPACE}:stale:{page_key}:size={size}:all'
+    lock_token = acquire_cache_lock(cache_key)
+    if lock_token is None:
+        try:
+            stale_response = redis.get(stale_key)
+            if stale_response:
+                return _cached_hotels_response(stale_response, user_id)
+        except Exception as e:
+            logger.warning('Redis is not available to get data: %s', e)
+        cached_response = wait_for_cache(cache_key)
+        if cached_response:
+            return _cached_hotels_response(cached_response, user_id)
+
+    # Count and page in one round trip
+    result = execute_neo4j_read(hotels_query, query_params)
+    response = _hotel_page_response(result, page, size, offset)
+    hotels_data = result[0]['rows']
+
+    # Cursor for the next page, if there may be one
+    response['next_cursor'] = None
+    if len(hotels_data) == size:
+        last_hotel = hotels_data[-1]
+        if last_hotel.get('raw_ranking') is not None:
+            response['next_cursor'] = _encode_cursor(
+                last_hotel['raw_ranking'], last_hotel['element_id']
+            )
 
-    result = execute_neo4j_query(hotels_query, query_params)
+    return conditional_response(
+        store_listing(
+            cache_key,
+            response,
+            user_id,
+            store=functools.partial(
+                _store_hotel_page, cache_key, stale_key, lock_token
+            ),
+        )
+    )
 
-    # Process results - now includes price fields
-    hotels_data = _process_hotel_results(result, user_id)
 
-    # Create paginated response
-    response = create_paging(
-        data=ShortHotelSchema(many=True).dump(hotels_data),
-        page=page,
-        size=size,
-        offset=offset,
-        total_count=total_count,
+def _search_hotels(search, page, size, offset, user_id):
+    """Search hotels by name."""
+    # Check if the result is cached
+    cache_key, cached_response = get_versioned_cache(
+        HOTEL_CACHE_NAMESPACE, f'page={page}:size={size}:search={search}'
     )
-
-    # Cache the response for 6 hours
     try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
+        if cached_response:
+            return _cached_hotels_response(cached_response, user_id)
     except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
+        logger.warning('Redis is not available to get data: %s', e)
+
+    # Create Cypher query parameters
+    query_params = {'offset': offset, 'size': size, 'search': search}
 
-    return response, 200
+    # Count and page in one round trip
+    result = execute_neo4j_read(SEARCH_HOTELS_QUERY, query_params)
+    response = _hotel_page_response(result, page, size, offset)
+
+    return conditional_response(store_listing(cache_key, response, user_id))
 
 
 def _filter_hotels(
@@ -568,208 +754,55 @@ def _filter_hotels(
     if features:
         cache_parts.append(f'features={",".join(sorted(features))}')
 
-    cache_key = f'hotels:{":".join(cache_parts)}'
-
     # Check Redis cache first
-    redis = get_redis()
+    cache_key, cached_response = get_versioned_cache(
+        HOTEL_CACHE_NAMESPACE, ':'.join(cache_parts)
+    )
     try:
-        cached_response = redis.get(cache_key)
         if cached_response:
-            hotels = json.loads(cached_response)
-            # Add is_favorite field for authenticated users
-            if user_id:
-                hotel_ids = [hotel['element_id'] for hotel in hotels['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(hotel_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for hotel in hotels['data']:
-                    hotel['is_favorite'] = hotel['element_id'] in favourite_ids
-            else:
-                for hotel in hotels['data']:
-                    hotel['is_favorite'] = False
-            return hotels, 200
+            return _cached_hotels_response(cached_response, user_id)
     except Exception as e:
         logger.warning('Redis cache unavailable: %s', e)
 
-    # Build unified query structure for both count and main queries
+    # Build unified query parameters for the count and page
     query_params = {'offset': offset, 'size': size}
 
-    # Determine if we need subquery approach to avoid Neo4j optimization bug
-    # Use subquery if we have any filtering (price, hotel_class, or rating)
-    needs_subquery = (
-        price is not None
-        or hotel_class is not None
-        or rating is not None
-        or features
-    )
-
-    if needs_subquery:
-        # Use subquery approach to avoid Neo4j optimization bug with ORDER BY + filtering
-
-        # Build initial filter conditions
-        filter_conditions = []
-        if hotel_class is not None:
-            # Start with hotel_class relationship match
-            base_match = """
-            MATCH (h:Hotel)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
-            WHERE hc.name = $hotel_class
-            """
-            query_params['hotel_class'] = hotel_class
-        else:
-            base_match = 'MATCH (h:Hotel)'
-
-        # Add other filter conditions
-        additional_filters = []
-        if price is not None:
-            additional_filters.append(
-                'h.min_price <= $price AND $price <= h.max_price'
-            )
-            query_params['price'] = price
-
-        if rating is not None:
-            additional_filters.append('h.rating >= $rating')
-            query_params['rating'] = rating
-
-        if features:
-            additional_filters.append(
-                'ALL(f_name IN $features WHERE (h)-[:HAS_FEATURE]->(:Feature {name: f_name}))'
-            )
-            query_params['features'] = features
-
-        # Build WHERE clause for additional filters
-        if additional_filters:
-            if hotel_class is not None:
-                # Already have WHERE clause from hotel_class, use AND
-                additional_where = f'AND {" AND ".join(additional_filters)}'
-            else:
-                # No previous WHERE clause, start with WHERE
-                additional_where = f'WHERE {" AND ".join(additional_filters)}'
-        else:
-            additional_where = ''
-
-        # Count query using the same structure
-        count_query = f"""
-        {base_match}
-        {additional_where}
-        RETURN count(h) AS total_count
-        """
-
-        # Main query using subquery pattern to avoid optimization bug
-        main_query = f"""
-        {base_match}
-        {additional_where}
-        WITH h
-        OPTIONAL MATCH (h)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-        OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)
-        OPTIONAL MATCH (h)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
-        OPTIONAL MATCH (h)-[:HAS_FEATURE]->(f:Feature)
-        RETURN h, elementId(h) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, hc.name AS hotel_class, collect(DISTINCT f.name) AS features
-        ORDER BY h.raw_ranking DESC
-        SKIP $offset
-        LIMIT $size
-        """
-    else:
-        # No filters, use simple approach
-        count_query = """
-        MATCH (h:Hotel)
-        RETURN count(h) AS total_count
-        """
-
-        main_query = """
-        MATCH (h:Hotel)
-        OPTIONAL MATCH (h)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-        OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)
-        OPTIONAL MATCH (h)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
-        OPTIONAL MATCH (h)-[:HAS_FEATURE]->(f:Feature)
-        RETURN h, elementId(h) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, hc.name AS hotel_class, collect(DISTINCT f.name) AS features
-        ORDER BY h.raw_ranking DESC
-        SKIP $offset
-        LIMIT $size
-        """
+    # Add the parameters of the filters in use; the query texts for each
+    # combination of filters are built once and reused
+    if hotel_class is not None:
+        query_params['hotel_class'] = hotel_class
+    if price is not None:
+        query_params['price'] = price
+    if rating is not None:
+        query_params['rating'] = rating
+    if features:
+        query_params['features'] = features
 
-    # Execute count query
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = total_count_result[0]['total_count']
+    query = FILTER_HOTEL_QUERIES[
+        (
+            hotel_class is not None,
+            price is not None,
+            rating is not None,
+            bool(features),
+        )
+    ]
 
-    # Execute main query
-    result = execute_neo4j_query(main_query, query_params)
-    hotels_data = _process_hotel_results(result, user_id)
+    # Count and page in one round trip
+    result = execute_neo4j_read(query, query_params)
+    response = _hotel_page_response(result, page, size, offset)
 
-    # Create paginated response
-    response = create_paging(
-        data=ShortHotelSchema(many=True).dump(hotels_data),
-        page=page,
-        size=size,
-        offset=offset,
-        total_count=total_count,
-    )
+    return conditional_response(store_listing(cache_key, response, user_id))
 
-    # Cache the result for 6 hours
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis cache set failed: %s', e)
-
-    return response, 200
-
-
-def _process_hotel_results(result, user_id):
-    """Process hotel query results and add element_id, price_levels, city, and price fields."""
-    # Add element_id, price_levels, and city to each hotel record
-    for record in result:
-        record['h']['element_id'] = record['element_id']
-        record['h']['price_levels'] = record['price_levels']
-        record['h']['city'] = record['city']
-        record['h']['hotel_class'] = record.get(
-            'hotel_class'
-        )  # Use .get for safety
-        record['h']['features'] = record.get('features', [])  # Add features
-        del record['element_id']
-        del record['price_levels']
-        del record['city']
-        if 'hotel_class' in record:
-            del record['hotel_class']
-        if 'features' in record:
-            del record['features']
-
-    hotels_data = [record['h'] for record in result]
-
-    # Add min_price and max_price fields to all hotels
-    hotels_data = add_price_fields_to_hotels(hotels_data)
-
-    # Add is_favorite field
-    if user_id:
-        hotel_ids = [hotel['element_id'] for hotel in hotels_data]
-        favourites = (
-            db.session.query(UserFavourite.place_id)
-            .filter(
-                UserFavourite.user_id == user_id,
-                UserFavourite.place_id.in_(hotel_ids),
-            )
-            .all()
-        )
-        favourite_ids = set(f[0] for f in favourites)
-        for hotel in hotels_data:
-            hotel['is_favorite'] = hotel['element_id'] in favourite_ids
-    else:
-        for hotel in hotels_data:
-            hotel['is_favorite'] = False
 
-    return hotels_data
+def _is_favourite(user_id, hotel_id):
+    """Check whether the user has marked the hotel as favourite."""
+    return hotel_id in get_favourite_ids(user_id, [hotel_id])
 
 
 @blueprint.get('/<hotel_id>')
 @blueprint.get('/<hotel_id>/')
 @jwt_required(optional=True)
 def get_hotel(hotel_id):
-    schema = HotelSchema()
-
     user_id = None
     try:
         user_id = get_jwt_identity()
@@ -779,91 +812,53 @@ def get_hotel(hotel_id):
     # Check if the result is cached
     redis = get_redis()
     cache_key = f'hotels:{hotel_id}'
+    cached_response = None
     try:
         cached_response = redis.get(cache_key)
-        if cached_response:
-            hotel = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                favourite = (
-                    db.session.query(UserFavourite)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id == hotel_id,
-                    )
-                    .first()
-                )
-                hotel['is_favorite'] = bool(favourite)
-            else:
-                hotel['is_favorite'] = False
-
-            # Add min_price and max_price fields from price_range
-            price_range = hotel.get('price_range')
-            min_price, max_price = extract_price_range(price_range)
-            hotel['min_price'] = min_price
-            hotel['max_price'] = max_price
-
-            return schema.dump(hotel), 200
     except Exception as e:
         logger.warning('Redis is not available to get data: %s', e)
 
-    # Get the hotel details along with features, price_levels, hotel_class, and city
-    result = execute_neo4j_query(
-        """
-        MATCH (h:Hotel)
-        WHERE elementId(h) = $hotel_id
-        OPTIONAL MATCH (h)-[:HAS_FEATURE]->(f:Feature)
-        OPTIONAL MATCH (h)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-        OPTIONAL MATCH (h)-[:BELONGS_TO_CLASS]->(hc:HotelClass)
-        OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)
-        RETURN
-            h,
-            elementId(h) AS element_id,
-            collect(DISTINCT f.name) AS features,
-            collect(DISTINCT pl.level) AS price_levels,
-            hc.name AS hotel_class,
-            c AS city
-        """,
-        {'hotel_id': hotel_id},
+    # Only one worker rebuilds a missing hotel; the others wait for it
+    lock_token = None
+    if not cached_response:
+        lock_token = acquire_cache_lock(cache_key)
+        if lock_token is None:
+            cached_response = wait_for_cache(cache_key)
+
+    if cached_response:
+        # The cached value is the dumped hotel with is_favorite false
+        if not user_id:
+            return conditional_response(json_body_response(cached_response))
+        hotel = orjson.loads(cached_response)
+        hotel['is_favorite'] = _is_favourite(user_id, hotel_id)
+        return conditional_response(json_response(hotel))
+
+    # Get the hotel details along with features, price_levels, hotel_class,
+    # and city; the favourite lookup below runs while Neo4j works
+    hotel_future = submit_neo4j_query(
+        HOTEL_DETAIL_QUERY, {'hotel_id': hotel_id}
     )
 
+    is_favorite = bool(user_id) and _is_favourite(user_id, hotel_id)
+
+    result = hotel_future.result()
     if not result:
+        if lock_token:
+            release_cache_lock(cache_key, lock_token)
         return {'error': 'Hotel not found'}, 404
 
-    hotel = result[0]['h']
-    hotel['element_id'] = result[0]['element_id']
-    hotel['features'] = result[0]['features']
-    hotel['price_levels'] = result[0]['price_levels']
-    hotel['hotel_class'] = result[0]['hotel_class']
-    hotel['city'] = result[0]['city']
-
-    # Add min_price and max_price fields from price_range
-    price_range = hotel.get('price_range')
-    min_price, max_price = extract_price_range(price_range)
-    hotel['min_price'] = min_price
-    hotel['max_price'] = max_price
-
-    # Add is_favorite field
-    if user_id:
-        favourite = (
-            db.session.query(UserFavourite)
-            .filter(
-                UserFavourite.user_id == user_id,
-                UserFavourite.place_id == hotel_id,
-            )
-            .first()
-        )
-        hotel['is_favorite'] = bool(favourite)
-    else:
-        hotel['is_favorite'] = False
+    # Already shaped by the projection, related data included
+    hotel = result[0]['hotel']
 
-    # Cache the response for 6 hours (without is_favorite, since it's user-specific)
-    try:
-        redis.set(cache_key, json.dumps(hotel), ex=21600)
-    except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
+    # Dump once, cache the user-agnostic result for 6 hours without
+    # holding up the response, then set the user's flag
+    data = hotel_schema.dump(hotel)
+    run_in_background(
+        _store_hotel_detail, cache_key, lock_token, orjson.dumps(data)
+    )
 
-    return schema.dump(hotel), 200
+    data['is_favorite'] = is_favorite
+    return conditional_response(json_response(data))
 
 
 @blueprint.delete('/<hotel_id>/')
@@ -2,9 +2,13 @@ import logging
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select, union
 
-from app.models import UserFavourite, UserReview
-from app.utils import execute_neo4j_query
+from app.models import UserFavourite, UserReview, db
+from app.utils import (
+    execute_neo4j_queries_concurrently,
+    execute_neo4j_query,
+)
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint('places', __name__, url_prefix='/places')
@@ -71,10 +75,11 @@ def search_place():
             'error': 'Invalid type. Must be one of hotel, restaurant, thingtodo, all.'
         }, 400
 
-    # Collect results from all queries
+    # Collect results from all queries, running them side by side
     results = []
-    for q in queries:
-        res = execute_neo4j_query(q, {'name': name})
+    for res in execute_neo4j_queries_concurrently(
+        *((q, {'name': name}) for q in queries)
+    ):
         results.extend(res)
 
     # Sort by raw_ranking descending and limit
@@ -127,48 +132,55 @@ def get_recommendations():
     user_id = get_jwt_identity()
 
     try:
-        # Get user's favorite places and rated places
-        favorites = UserFavourite.query.filter_by(user_id=user_id).all()
-        user_ratings = UserReview.query.filter_by(user_id=user_id).all()
-
-        # Combine favorite and rated place IDs
-        user_place_ids = set()
-        user_place_ids.update(fav.place_id for fav in favorites)
-        user_place_ids.update(rating.place_id for rating in user_ratings)
+        # Get the ids of the user's favorite and rated places in one query,
+        # without loading full ORM objects
+        user_place_ids = set(
+            db.session.execute(
+                union(
+                    select(UserFavourite.place_id).where(
+                        UserFavourite.user_id == user_id
+                    ),
+                    select(UserReview.place_id).where(
+                        UserReview.user_id == user_id
+                    ),
+                )
+            ).scalars()
+        )
 
         if not user_place_ids:
             # If no favorites or ratings, return popular things-to-do
             return get_popular_things_to_do()
 
-        # Get details of user's places from Neo4j
-        user_places = []
-
-        # Batch query Neo4j for user's places
-        results = execute_neo4j_query(
-            """
-            MATCH (p:ThingToDo)
-            WHERE elementId(p) IN $place_ids
-            RETURN p, elementId(p) AS element_id, labels(p) AS types
-            """,
-            {'place_ids': list(user_place_ids)},
+        # Fetch the user's places and the candidate places side by side;
+        # both only depend on the ids read from Postgres
+        place_ids = list(user_place_ids)
+        results, all_places_results = execute_neo4j_queries_concurrently(
+            (
+                """
+                MATCH (p:ThingToDo)
+                WHERE elementId(p) IN $place_ids
+                RETURN p, elementId(p) AS element_id, labels(p) AS types
+                """,
+                {'place_ids': place_ids},
+            ),
+            (
+                """
+                MATCH (p:ThingToDo)
+                WHERE NOT elementId(p) IN $user_place_ids
+                RETURN p, elementId(p) AS element_id, labels(p) AS types
+                """,
+                {'user_place_ids': place_ids},
+            ),
         )
 
+        # Get details of user's places from Neo4j
+        user_places = []
         for result_item in results:
             place_data = result_item['p']
             place_id = result_item['element_id']
             place_data['element_id'] = place_id
             user_places.append(place_data)
 
-        # Get all things-to-do places from Neo4j (excluding user's places)
-        all_places_results = execute_neo4j_query(
-            """
-            MATCH (p:ThingToDo)
-            WHERE NOT elementId(p) IN $user_place_ids
-            RETURN p, elementId(p) AS element_id, labels(p) AS types
-            """,
-            {'user_place_ids': list(user_place_ids)},
-        )
-
         # Calculate similarity scores for each place
         recommendations = []
         for result_item in all_places_results:
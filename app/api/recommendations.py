@@ -1,9 +1,9 @@
-import json
 import logging
 from collections import Counter, defaultdict
 from typing import Dict, List, Tuple
 
 import numpy as np
+import orjson
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from geopy.distance import geodesic
@@ -11,7 +11,13 @@ from marshmallow import ValidationError, fields, validates
 
 from app.extensions import ma
 from app.models import db
-from app.utils import create_paging, execute_neo4j_query, get_redis
+from app.utils import (
+    create_paging,
+    execute_neo4j_query,
+    get_redis,
+    purge_tracked_cache,
+    set_tracked_cache,
+)
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint(
@@ -118,8 +124,7 @@ def get_user_preferences(user_id: str) -> Dict:
 
         # Get place details from Neo4j
         neo4j_query = """
-        UNWIND $place_ids AS pid
-        MATCH (p) WHERE elementId(p) = pid
+        MATCH (p) WHERE elementId(p) IN $place_ids
         OPTIONAL MATCH (p)-[:HAS_SUBCATEGORY]->(sc:Subcategory)
         OPTIONAL MATCH (p)-[:HAS_SUBTYPE]->(st:Subtype)
         RETURN elementId(p) AS place_id,
@@ -642,7 +647,7 @@ def get_recommendations():
                 logger.info(
                     f'Returning cached recommendations for user {user_id}'
                 )
-                return jsonify(json.loads(cached_data)), 200
+                return jsonify(orjson.loads(cached_data)), 200
         except Exception as e:
             logger.warning(f'Redis cache error: {str(e)}')
 
@@ -746,8 +751,12 @@ def get_recommendations():
 
         # Cache for 30 minutes
         try:
-            redis = get_redis()
-            redis.setex(cache_key, 1800, json.dumps(result))
+            set_tracked_cache(
+                f'recommendations:{user_id}:keys',
+                cache_key,
+                orjson.dumps(result),
+                1800,
+            )
         except Exception as e:
             logger.warning(f'Failed to cache recommendations: {str(e)}')
 
@@ -767,13 +776,10 @@ def refresh_user_recommendations():
 
         # Clear all cached recommendations for this user
         try:
-            redis = get_redis()
-            pattern = f'recommendations:{user_id}:*'
-            keys_to_delete = redis.keys(pattern)
-            if keys_to_delete:
-                redis.delete(*keys_to_delete)
+            deleted = purge_tracked_cache(f'recommendations:{user_id}:keys')
+            if deleted:
                 logger.info(
-                    f'Cleared {len(keys_to_delete)} cached recommendations for user {user_id}'
+                    f'Cleared {deleted} cached recommendations for user {user_id}'
                 )
         except Exception as e:
             logger.warning(f'Redis cache error: {str(e)}')
@@ -1,13 +1,17 @@
-import json
+import itertools
 import logging
 
+import orjson
 from flask import Blueprint, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import ValidationError, fields, pre_load, validates
+from sqlalchemy import literal, select
 
 from app.extensions import ma
 from app.models import UserFavourite, db
 from app.utils import (
+    bump_cache_version,
+    compile_dumper,
     create_paging,
     delete_place_and_related_data,
     execute_neo4j_query,
@@ -16,12 +20,19 @@ from app.utils import (
     get_all_dishes,
     get_all_meal_types,
     get_all_restaurant_features,
+    get_cached_listing,
     get_redis,
+    json_response,
+    overall_rating,
+    store_listing,
 )
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint('restaurants', __name__, url_prefix='/restaurants')
 
+# List caches are keyed by a generation number, like the hotel lists
+RESTAURANT_CACHE_NAMESPACE = 'restaurants'
+
 
 class SimplifiedHourSchema(ma.Schema):
     open = fields.String(required=True)
@@ -39,6 +50,9 @@ class HoursSchema(ma.Schema):
     timezone = fields.String(allow_none=True)
 
 
+CITY_NOT_FOUND_MESSAGE = 'City with this postal code does not exist'
+
+
 class AttachCitySchema(ma.Schema):
     created_at = fields.String(dump_only=True)
     element_id = fields.String(dump_only=True)
@@ -46,19 +60,6 @@ class AttachCitySchema(ma.Schema):
 
     postal_code = fields.String(required=True)
 
-    @validates('postal_code')
-    def validate_postal_code(self, value: str):
-        result = execute_neo4j_query(
-            """
-            MATCH (c:City {postal_code: $postal_code})
-            RETURN c
-            """,
-            {'postal_code': value},
-        )
-        if not result:
-            raise ValidationError('City with this postal code does not exist')
-        return value
-
 
 class ShortRestaurantSchema(ma.Schema):
     created_at = fields.String(dump_only=True)
@@ -91,7 +92,8 @@ class ShortRestaurantSchema(ma.Schema):
             raise ValidationError(
                 'Rating histogram must contain exactly 5 integers'
             )
-        if value and not all(isinstance(i, int) and i >= 0 for i in value):
+        # fields.Integer has already coerced the elements to int
+        if value and min(value) < 0:
             raise ValidationError(
                 'Rating histogram must be a list of 5 non-negative integers'
             )
@@ -110,20 +112,9 @@ class ShortRestaurantSchema(ma.Schema):
             data['rating'] = 0
 
         # Calculate rating from histogram if available
-        if (
-            'rating_histogram' in data
-            and isinstance(data['rating_histogram'], list)
-            and len(data['rating_histogram']) == 5
-        ):
-            rh = data['rating_histogram']
-            total = sum(rh)
-            if total > 0:
-                calculated_rating = (
-                    sum((i + 1) * rh[i] for i in range(5)) / total
-                )
-                data['rating'] = round(calculated_rating, 1)
-            else:
-                data['rating'] = 0
+        rating_histogram = data['rating_histogram']
+        if isinstance(rating_histogram, list) and len(rating_histogram) == 5:
+            data['rating'] = overall_rating(rating_histogram)
 
         return data
 
@@ -147,6 +138,14 @@ class RestaurantSchema(ShortRestaurantSchema):
     traveler_choice_award = fields.Boolean(required=False, default=False)
 
 
+short_restaurant_schema = ShortRestaurantSchema()
+restaurant_schema = RestaurantSchema()
+
+
+# Listing pages are dumped through a dumper compiled from the schema
+_dump_short_restaurant = compile_dumper(short_restaurant_schema)
+
+
 @blueprint.get('/cuisines/')
 def get_cuisines():
     """Get all available cuisines for restaurants."""
@@ -182,9 +181,165 @@ def get_dishes():
     return {'dishes': dishes}, 200
 
 
+# Listed restaurant shaped server-side as one map, so rows need no
+# reshaping
+RESTAURANT_LIST_PROJECTION = """r {
+    .*,
+    element_id: elementId(r),
+    price_levels: [(r)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel) | pl.level],
+    city: head([(r)-[:LOCATED_IN]->(c:City) | c]),
+    cuisines: [(r)-[:HAS_CUISINE]->(cu:Cuisine) | cu.name],
+    meal_types: [(r)-[:SERVES_MEAL]->(mt:MealType) | mt.name],
+    features: [(r)-[:HAS_FEATURE]->(f:Feature) | f.name]
+}"""
+
+# Count and page of the unfiltered listing in one query. The page is
+# collected inside a subquery so the total is returned even when the page
+# is empty.
+ALL_RESTAURANTS_QUERY = f"""
+MATCH (all_restaurants:Restaurant)
+WITH count(all_restaurants) AS total_count
+CALL {{
+    MATCH (r:Restaurant)
+    WITH r
+    ORDER BY r.raw_ranking DESC
+    SKIP $offset
+    LIMIT $size
+    RETURN collect({RESTAURANT_LIST_PROJECTION}) AS rows
+}}
+RETURN total_count, rows
+"""
+
+# Count and page of the restaurants matched before it, in one query. The
+# matches are collected once so the total and the slice come from the
+# same round trip, and an empty page still returns the total.
+_MATCHED_RESTAURANTS_PAGE = f"""
+WITH r
+ORDER BY r.raw_ranking DESC
+WITH collect(r) AS matched
+RETURN
+    size(matched) AS total_count,
+    [r IN matched[$offset..$offset + $size] | {RESTAURANT_LIST_PROJECTION}]
+        AS rows
+"""
+
+SEARCH_RESTAURANTS_QUERY = f"""
+MATCH (r:Restaurant)
+WHERE toLower(r.name) CONTAINS toLower($search)
+{_MATCHED_RESTAURANTS_PAGE}
+"""
+
+
+def _filter_restaurant_query(
+    has_rating,
+    has_cuisines,
+    has_meal_types,
+    has_features,
+    has_dietary_restrictions,
+    has_dishes,
+):
+    """
+    Build the count and page query for a combination of restaurant filters.
+
+    Only the presence of each filter changes the text, so there are at
+    most 64 variants; all of them are built at import time.
+    """
+    where_clauses = []
+    if has_rating:
+        where_clauses.append('r.rating >= $rating')
+    if has_cuisines:
+        where_clauses.append(
+            'ALL(c_name IN $cuisines WHERE (r)-[:HAS_CUISINE]->(:Cuisine {name: c_name}))'
+        )
+    if has_meal_types:
+        where_clauses.append(
+            'ALL(mt_name IN $meal_types WHERE (r)-[:SERVES_MEAL]->(:MealType {name: mt_name}))'
+        )
+    if has_features:
+        where_clauses.append(
+            'ALL(f_name IN $features WHERE (r)-[:HAS_FEATURE]->(:Feature {name: f_name}))'
+        )
+    if has_dietary_restrictions:
+        where_clauses.append(
+            'ALL(dr_name IN $dietary_restrictions WHERE dr_name IN r.dietary_restrictions)'
+        )
+    if has_dishes:
+        where_clauses.append('ALL(d_name IN $dishes WHERE d_name IN r.dishes)')
+
+    where_str = ''
+    if where_clauses:
+        where_str = 'WHERE ' + ' AND '.join(where_clauses)
+
+    return f"""
+    MATCH (r:Restaurant)
+    {where_str}
+    {_MATCHED_RESTAURANTS_PAGE}
+    """
+
+
+# Filter queries keyed by (has_rating, has_cuisines, has_meal_types,
+# has_features, has_dietary_restrictions, has_dishes)
+FILTER_RESTAURANT_QUERIES = {
+    flags: _filter_restaurant_query(*flags)
+    for flags in itertools.product((False, True), repeat=6)
+}
+
+# The query text is the same for every payload so Neo4j reuses its cached
+# plan; empty lists make the FOREACH clauses no-ops
+CREATE_RESTAURANT_QUERY = """
+MATCH (c:City {postal_code: $postal_code})
+CREATE
+    (r:Restaurant
+        {
+            name: $name,
+            image: $image,
+            latitude: $latitude,
+            longitude: $longitude,
+            photos: $photos,
+            rating: $rating,
+            rating_histogram: $rating_histogram,
+            raw_ranking: $raw_ranking,
+            description: $description,
+            email: $email,
+            phone: $phone,
+            website: $website,
+            menu_web_url: $menu_web_url,
+            hours: $hours,
+            dishes: $dishes,
+            dietary_restrictions: $dietary_restrictions,
+            traveler_choice_award: $traveler_choice_award,
+            street: $street,
+            type: 'RESTAURANT',
+            created_at:
+                apoc.date.format(timestamp(), 'ms', 'yyyy-MM-dd HH:mm', 'GMT+7')
+        })
+MERGE (r)-[:LOCATED_IN]->(c)
+FOREACH (feature_name IN $features |
+    MERGE (a:Feature {name: feature_name})
+    MERGE (r)-[:HAS_FEATURE]->(a)
+)
+FOREACH (price_level IN $price_levels |
+    MERGE (pl:PriceLevel {level: price_level})
+    MERGE (r)-[:HAS_PRICE_LEVEL]->(pl)
+)
+FOREACH (meal_type IN $meal_types |
+    MERGE (mt:MealType {name: meal_type})
+    MERGE (r)-[:SERVES_MEAL]->(mt)
+)
+FOREACH (cuisine IN $cuisines |
+    MERGE (cu:Cuisine {name: cuisine})
+    MERGE (r)-[:HAS_CUISINE]->(cu)
+)
+RETURN
+    r,
+    elementId(r) AS element_id,
+    c
+"""
+
+
 @blueprint.post('/')
 def create_restaurant():
-    data = RestaurantSchema().load(request.json)
+    data = restaurant_schema.load(request.json)
     city_postal_code = data['city']['postal_code']
 
     # Get data with defaults for empty lists
@@ -193,84 +348,9 @@ def create_restaurant():
     meal_types = data.get('meal_types', [])
     cuisines = data.get('cuisines', [])
 
-    # Base query to create restaurant
-    query = """
-    MATCH (c:City {postal_code: $postal_code})
-    CREATE
-        (r:Restaurant
-            {
-                name: $name,
-                image: $image,
-                latitude: $latitude,
-                longitude: $longitude,
-                photos: $photos,
-                rating: $rating,
-                rating_histogram: $rating_histogram,
-                raw_ranking: $raw_ranking,
-                description: $description,
-                email: $email,
-                phone: $phone,
-                website: $website,
-                menu_web_url: $menu_web_url,
-                hours: $hours,
-                dishes: $dishes,
-                dietary_restrictions: $dietary_restrictions,
-                traveler_choice_award: $traveler_choice_award,
-                street: $street,
-                type: 'RESTAURANT',
-                created_at:
-                    apoc.date.format(timestamp(), 'ms', 'yyyy-MM-dd HH:mm', 'GMT+7')
-            })
-    MERGE (r)-[:LOCATED_IN]->(c)
-    """
-
-    # Add features relationship if features list is not empty
-    if features:
-        query += """
-        WITH r, c
-        UNWIND $features AS feature_name
-        MERGE (a:Feature {name: feature_name})
-        MERGE (r)-[:HAS_FEATURE]->(a)
-        """
-
-    # Add price_levels relationship if price_levels list is not empty
-    if price_levels:
-        query += """
-        WITH r, c
-        UNWIND $price_levels AS price_level
-        MERGE (pl:PriceLevel {level: price_level})
-        MERGE (r)-[:HAS_PRICE_LEVEL]->(pl)
-        """
-
-    # Add meal_types relationship if meal_types list is not empty
-    if meal_types:
-        query += """
-        WITH r, c
-        UNWIND $meal_types AS meal_type
-        MERGE (mt:MealType {name: meal_type})
-        MERGE (r)-[:SERVES_MEAL]->(mt)
-        """
-
-    # Add cuisines relationship if cuisines list is not empty
-    if cuisines:
-        query += """
-        WITH r, c
-        UNWIND $cuisines AS cuisine
-        MERGE (cu:Cuisine {name: cuisine})
-        MERGE (r)-[:HAS_CUISINE]->(cu)
-        """
-
-    # Finalize query to return data
-    query += """
-    RETURN
-        r,
-        elementId(r) AS element_id,
-        c
-    """
-
     # Execute the Neo4j query
     result = execute_neo4j_query(
-        query,
+        CREATE_RESTAURANT_QUERY,
         {
             'postal_code': city_postal_code,
             'name': data['name'],
@@ -287,7 +367,7 @@ def create_restaurant():
             'phone': data.get('phone'),
             'website': data.get('website'),
             'menu_web_url': data.get('menu_web_url'),
-            'hours': json.dumps(data.get('hours'))
+            'hours': orjson.dumps(data.get('hours')).decode()
             if data.get('hours')
             else None,
             'dishes': data.get('dishes', []),
@@ -300,19 +380,23 @@ def create_restaurant():
         },
     )
 
+    # The query only creates the restaurant when it matches the city, so no
+    # row means the postal code is unknown
     if not result:
-        return {'error': 'Failed to create restaurant.'}, 400
+        raise ValidationError(
+            {'city': {'postal_code': [CITY_NOT_FOUND_MESSAGE]}}
+        )
 
-    # Delete cached restaurant data
-    redis = get_redis()
-    keys_to_delete = redis.keys('restaurants:*')
-    if keys_to_delete:
-        redis.delete(*keys_to_delete)
+    # Invalidate cached restaurant lists
+    try:
+        bump_cache_version(RESTAURANT_CACHE_NAMESPACE)
+    except Exception as e:
+        logger.warning('Redis is not available to set data: %s', e)
 
     restaurant = result[0]['r']
     restaurant['element_id'] = result[0]['element_id']
     restaurant['city'] = result[0]['c']
-    return ShortRestaurantSchema().dump(restaurant), 201
+    return short_restaurant_schema.dump(restaurant), 201
 
 
 @blueprint.get('/')
@@ -377,179 +461,68 @@ def get_restaurants():
         )
 
 
-def _process_restaurant_results(result, user_id):
-    """Helper function to process Neo4j results for restaurants."""
-    # Add element_id, price_levels, and city to each restaurant record
-    for record in result:
-        record['r']['element_id'] = record['element_id']
-        record['r']['price_levels'] = record.get('price_levels', [])
-        record['r']['cuisines'] = record.get('cuisines', [])
-        record['r']['meal_types'] = record.get('meal_types', [])
-        record['r']['features'] = record.get('features', [])
-        if record['city']:
-            record['r']['city'] = record['city']
+def _process_restaurant_rows(rows):
+    """Finish restaurants shaped by RESTAURANT_LIST_PROJECTION."""
+    for restaurant in rows:
+        # The schema leaves out a missing city rather than dumping null
+        if restaurant['city'] is None:
+            del restaurant['city']
 
-    restaurants_data = [record['r'] for record in result]
-
-    # Add is_favorite field
-    if user_id:
-        restaurant_ids = [r['element_id'] for r in restaurants_data]
-        favourites = (
-            db.session.query(UserFavourite.place_id)
-            .filter(
-                UserFavourite.user_id == user_id,
-                UserFavourite.place_id.in_(restaurant_ids),
-            )
-            .all()
-        )
-        favourite_ids = set(f[0] for f in favourites)
-        for r in restaurants_data:
-            r['is_favorite'] = r['element_id'] in favourite_ids
-    else:
-        for r in restaurants_data:
-            r['is_favorite'] = False
-
-    return restaurants_data
+    return rows
 
 
 def _get_all_restaurants(page, size, offset, user_id):
     """Get all restaurants with pagination."""
-    redis = get_redis()
-    cache_key = f'restaurants:page={page}:size={size}:all'
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            restaurants = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                restaurant_ids = [r['element_id'] for r in restaurants['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(restaurant_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for r in restaurants['data']:
-                    r['is_favorite'] = r['element_id'] in favourite_ids
-            else:
-                for r in restaurants['data']:
-                    r['is_favorite'] = False
-            return restaurants, 200
-    except Exception as e:
-        logger.warning('Redis is not available to get data: %s', e)
-
-    count_query = 'MATCH (r:Restaurant) RETURN count(r) AS total_count'
-    total_count_result = execute_neo4j_query(count_query)
-    total_count = total_count_result[0]['total_count']
-
-    restaurants_query = """
-    MATCH (r:Restaurant)
-    OPTIONAL MATCH (r)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-    OPTIONAL MATCH (r)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (r)-[:HAS_CUISINE]->(cu:Cuisine)
-    OPTIONAL MATCH (r)-[:SERVES_MEAL]->(mt:MealType)
-    OPTIONAL MATCH (r)-[:HAS_FEATURE]->(f:Feature)
-    WITH r, c, pl, collect(DISTINCT cu.name) AS cuisines, collect(DISTINCT mt.name) AS meal_types, collect(DISTINCT f.name) AS features
-    RETURN r, elementId(r) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, cuisines, meal_types, features
-    ORDER BY r.raw_ranking DESC
-    SKIP $offset
-    LIMIT $size
-    """
+    cache_key, cached = get_cached_listing(
+        RESTAURANT_CACHE_NAMESPACE, f'page={page}:size={size}:all', user_id
+    )
+    if cached:
+        return cached
 
+    # Count and page in one round trip
     result = execute_neo4j_query(
-        restaurants_query, {'offset': offset, 'size': size}
+        ALL_RESTAURANTS_QUERY, {'offset': offset, 'size': size}
     )
-    restaurants_data = _process_restaurant_results(result, user_id)
+    total_count = result[0]['total_count']
+    restaurants_data = _process_restaurant_rows(result[0]['rows'])
 
     response = create_paging(
-        data=ShortRestaurantSchema(many=True).dump(restaurants_data),
+        data=[_dump_short_restaurant(r) for r in restaurants_data],
         page=page,
         size=size,
         offset=offset,
         total_count=total_count,
     )
 
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
-
-    return response, 200
+    return store_listing(cache_key, response, user_id)
 
 
 def _search_restaurants(search, page, size, offset, user_id):
     """Search restaurants by name."""
-    redis = get_redis()
-    cache_key = f'restaurants:page={page}:size={size}:search={search}'
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            restaurants = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                restaurant_ids = [r['element_id'] for r in restaurants['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(restaurant_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for r in restaurants['data']:
-                    r['is_favorite'] = r['element_id'] in favourite_ids
-            else:
-                for r in restaurants['data']:
-                    r['is_favorite'] = False
-            return restaurants, 200
-    except Exception as e:
-        logger.warning('Redis is not available to get data: %s', e)
+    cache_key, cached = get_cached_listing(
+        RESTAURANT_CACHE_NAMESPACE,
+        f'page={page}:size={size}:search={search}',
+        user_id,
+    )
+    if cached:
+        return cached
 
     query_params = {'offset': offset, 'size': size, 'search': search}
 
-    count_query = """
-    MATCH (r:Restaurant)
-    WHERE toLower(r.name) CONTAINS toLower($search)
-    RETURN count(r) AS total_count
-    """
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = total_count_result[0]['total_count']
-
-    restaurants_query = """
-    MATCH (r:Restaurant)
-    WHERE toLower(r.name) CONTAINS toLower($search)
-    OPTIONAL MATCH (r)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-    OPTIONAL MATCH (r)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (r)-[:HAS_CUISINE]->(cu:Cuisine)
-    OPTIONAL MATCH (r)-[:SERVES_MEAL]->(mt:MealType)
-    OPTIONAL MATCH (r)-[:HAS_FEATURE]->(f:Feature)
-    WITH r, c, pl, collect(DISTINCT cu.name) AS cuisines, collect(DISTINCT mt.name) AS meal_types, collect(DISTINCT f.name) AS features
-    RETURN r, elementId(r) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, cuisines, meal_types, features
-    ORDER BY r.raw_ranking DESC
-    SKIP $offset
-    LIMIT $size
-    """
-    result = execute_neo4j_query(restaurants_query, query_params)
-    restaurants_data = _process_restaurant_results(result, user_id)
+    # Count and page in one round trip
+    result = execute_neo4j_query(SEARCH_RESTAURANTS_QUERY, query_params)
+    total_count = result[0]['total_count']
+    restaurants_data = _process_restaurant_rows(result[0]['rows'])
 
     response = create_paging(
-        data=ShortRestaurantSchema(many=True).dump(restaurants_data),
+        data=[_dump_short_restaurant(r) for r in restaurants_data],
         page=page,
         size=size,
         offset=offset,
         total_count=total_count,
     )
 
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
-
-    return response, 200
+    return store_listing(cache_key, response, user_id)
 
 
 def _filter_restaurants(
@@ -565,8 +538,6 @@ def _filter_restaurants(
     user_id,
 ):
     """Filter restaurants based on various criteria."""
-    redis = get_redis()
-
     # Build a dynamic cache key
     cache_parts = [f'page={page}', f'size={size}', 'filter']
     if rating is not None:
@@ -583,117 +554,58 @@ def _filter_restaurants(
         )
     if dishes:
         cache_parts.append(f'dishes={",".join(sorted(dishes))}')
-    cache_key = f'restaurants:{":".join(cache_parts)}'
 
     # Check Redis cache first
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            restaurants = json.loads(cached_response)
-            # Add is_favorite field for authenticated users
-            if user_id:
-                restaurant_ids = [r['element_id'] for r in restaurants['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(restaurant_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for r in restaurants['data']:
-                    r['is_favorite'] = r['element_id'] in favourite_ids
-            else:
-                for r in restaurants['data']:
-                    r['is_favorite'] = False
-            return restaurants, 200
-    except Exception as e:
-        logger.warning('Redis cache unavailable: %s', e)
+    cache_key, cached = get_cached_listing(
+        RESTAURANT_CACHE_NAMESPACE, ':'.join(cache_parts), user_id
+    )
+    if cached:
+        return cached
 
-    # Build the query dynamically
+    # Pick the prebuilt query for this combination of filters
     query_params = {'offset': offset, 'size': size}
-    where_clauses = []
-
     if rating is not None:
-        where_clauses.append('r.rating >= $rating')
         query_params['rating'] = rating
     if cuisines:
-        where_clauses.append(
-            'ALL(c_name IN $cuisines WHERE (r)-[:HAS_CUISINE]->(:Cuisine {name: c_name}))'
-        )
         query_params['cuisines'] = cuisines
     if meal_types:
-        where_clauses.append(
-            'ALL(mt_name IN $meal_types WHERE (r)-[:SERVES_MEAL]->(:MealType {name: mt_name}))'
-        )
         query_params['meal_types'] = meal_types
     if features:
-        where_clauses.append(
-            'ALL(f_name IN $features WHERE (r)-[:HAS_FEATURE]->(:Feature {name: f_name}))'
-        )
         query_params['features'] = features
     if dietary_restrictions:
-        where_clauses.append(
-            'ALL(dr_name IN $dietary_restrictions WHERE dr_name IN r.dietary_restrictions)'
-        )
         query_params['dietary_restrictions'] = dietary_restrictions
     if dishes:
-        where_clauses.append('ALL(d_name IN $dishes WHERE d_name IN r.dishes)')
         query_params['dishes'] = dishes
+    restaurants_query = FILTER_RESTAURANT_QUERIES[
+        (
+            rating is not None,
+            bool(cuisines),
+            bool(meal_types),
+            bool(features),
+            bool(dietary_restrictions),
+            bool(dishes),
+        )
+    ]
 
-    where_str = ''
-    if where_clauses:
-        where_str = 'WHERE ' + ' AND '.join(where_clauses)
-
-    count_query = f"""
-    MATCH (r:Restaurant)
-    {where_str}
-    RETURN count(r) AS total_count
-    """
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = (
-        total_count_result[0]['total_count'] if total_count_result else 0
-    )
-
-    restaurants_query = f"""
-    MATCH (r:Restaurant)
-    {where_str}
-    OPTIONAL MATCH (r)-[:HAS_PRICE_LEVEL]->(pl:PriceLevel)
-    OPTIONAL MATCH (r)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (r)-[:HAS_CUISINE]->(cu:Cuisine)
-    OPTIONAL MATCH (r)-[:SERVES_MEAL]->(mt:MealType)
-    OPTIONAL MATCH (r)-[:HAS_FEATURE]->(f:Feature)
-    WITH r, c, pl, collect(DISTINCT cu.name) AS cuisines, collect(DISTINCT mt.name) AS meal_types, collect(DISTINCT f.name) AS features
-    RETURN r, elementId(r) AS element_id, collect(DISTINCT pl.level) AS price_levels, c AS city, cuisines, meal_types, features
-    ORDER BY r.raw_ranking DESC
-    SKIP $offset
-    LIMIT $size
-    """
+    # Count and page in one round trip
     result = execute_neo4j_query(restaurants_query, query_params)
-    restaurants_data = _process_restaurant_results(result, user_id)
+    total_count = result[0]['total_count']
+    restaurants_data = _process_restaurant_rows(result[0]['rows'])
 
     response = create_paging(
-        data=ShortRestaurantSchema(many=True).dump(restaurants_data),
+        data=[_dump_short_restaurant(r) for r in restaurants_data],
         page=page,
         size=size,
         offset=offset,
         total_count=total_count,
     )
 
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis cache set failed: %s', e)
-
-    return response, 200
+    return store_listing(cache_key, response, user_id)
 
 
 @blueprint.get('/<restaurant_id>/')
 @jwt_required(optional=True)
 def get_restaurant(restaurant_id):
-    schema = RestaurantSchema()
-
     user_id = None
     try:
         user_id = get_jwt_identity()
@@ -706,7 +618,7 @@ def get_restaurant(restaurant_id):
     try:
         cached_response = redis.get(cache_key)
         if cached_response:
-            restaurant = json.loads(cached_response)
+            restaurant = orjson.loads(cached_response)
             # Add is_favorite field if user is authenticated
             user_id = None
             try:
@@ -715,15 +627,18 @@ def get_restaurant(restaurant_id):
                 pass
             if user_id:
                 is_favorite = (
-                    db.session.query(UserFavourite)
-                    .filter_by(user_id=user_id, place_id=restaurant_id)
-                    .first()
+                    db.session.execute(
+                        select(literal(1)).where(
+                            UserFavourite.user_id == user_id,
+                            UserFavourite.place_id == restaurant_id,
+                        )
+                    ).scalar()
                     is not None
                 )
                 restaurant['is_favorite'] = is_favorite
             else:
                 restaurant['is_favorite'] = False
-            return schema.dump(restaurant), 200
+            return json_response(restaurant_schema.dump(restaurant))
     except Exception as e:
         logger.exception(e)
         logger.warning('Redis is not available to get data: %s', e)
@@ -765,7 +680,7 @@ def get_restaurant(restaurant_id):
     # Parse hours JSON if stored as string
     if 'hours' in restaurant and isinstance(restaurant['hours'], str):
         try:
-            restaurant['hours'] = json.loads(restaurant['hours'])
+            restaurant['hours'] = orjson.loads(restaurant['hours'])
         except Exception:
             restaurant['hours'] = None
 
@@ -777,9 +692,12 @@ def get_restaurant(restaurant_id):
         pass
     if user_id:
         is_favorite = (
-            db.session.query(UserFavourite)
-            .filter_by(user_id=user_id, place_id=restaurant_id)
-            .first()
+            db.session.execute(
+                select(literal(1)).where(
+                    UserFavourite.user_id == user_id,
+                    UserFavourite.place_id == restaurant_id,
+                )
+            ).scalar()
             is not None
         )
         restaurant['is_favorite'] = is_favorite
@@ -788,11 +706,11 @@ def get_restaurant(restaurant_id):
 
     # Cache the response for 6 hours (without is_favorite, since it's user-specific)
     try:
-        redis.set(cache_key, json.dumps(restaurant), ex=21600)
+        redis.set(cache_key, orjson.dumps(restaurant), ex=21600)
     except Exception as e:
         logger.warning('Redis is not available to set data: %s', e)
 
-    return schema.dump(restaurant), 200
+    return json_response(restaurant_schema.dump(restaurant))
 
 
 @blueprint.delete('/<restaurant_id>/')
@@ -1,7 +1,7 @@
-import json
 import logging
 import time
 
+import orjson
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
@@ -12,6 +12,7 @@ from app.utils import (
     check_place_exists,
     create_paging,
     get_redis,
+    purge_cache,
     update_place_rating_histogram,
     update_user_preference_cache,
 )
@@ -60,7 +61,7 @@ def get_cached_reviews(cache_key: str) -> dict:
     try:
         redis = get_redis()
         cached_data = redis.get(cache_key)
-        result = json.loads(cached_data) if cached_data else None
+        result = orjson.loads(cached_data) if cached_data else None
 
         # Log cache hit/miss for debugging
         elapsed = time.time() - start_time
@@ -81,7 +82,7 @@ def cache_reviews(cache_key: str, reviews: dict, expire_seconds: int = 3600):
     try:
         redis = get_redis()
         # Cache for specified time (default: 1 hour)
-        redis.setex(cache_key, expire_seconds, json.dumps(reviews))
+        redis.setex(cache_key, expire_seconds, orjson.dumps(reviews))
         elapsed = time.time() - start_time
         logger.debug(
             f'CACHE SET: {cache_key} in {elapsed:.3f}s (expires in {expire_seconds}s)'
@@ -94,38 +95,26 @@ def invalidate_caches(place_id: str):
     """Invalidate review-related caches efficiently."""
     start_time = time.time()
     try:
-        redis = get_redis()
-        keys_to_delete = []
-
-        # Add specific place review cache keys
-        place_review_pattern = f'url:/reviews/{place_id}*'
-        place_keys = redis.keys(place_review_pattern)
-        if place_keys:
-            keys_to_delete.extend(place_keys)
+        # Specific place review cache keys
+        deleted = purge_cache(f'url:/reviews/{place_id}*')
 
-        # Add place data cache keys
-        place_data_keys = [
+        # Place data cache keys
+        deleted += get_redis().unlink(
             f'hotels:{place_id}',
             f'restaurants:{place_id}',
             f'things-to-do:{place_id}',
-        ]
-        keys_to_delete.extend(place_data_keys)
-
-        # Delete all keys in a single operation if we have any
-        if keys_to_delete:
-            redis.delete(*keys_to_delete)
-            elapsed = time.time() - start_time
-            logger.debug(
-                f'CACHE INVALIDATED: {len(keys_to_delete)} keys for place {place_id} in {elapsed:.3f}s'
-            )
+            f'place_details:{place_id}',
+        )
+        elapsed = time.time() - start_time
+        logger.debug(
+            f'CACHE INVALIDATED: {deleted} keys for place {place_id} in {elapsed:.3f}s'
+        )
 
-        # Invalidate all reviews cache - but only if needed
-        all_reviews_pattern = 'url:/reviews/all*'
-        all_reviews_keys = redis.keys(all_reviews_pattern)
-        if all_reviews_keys:
-            redis.delete(*all_reviews_keys)
+        # Invalidate all reviews cache
+        all_reviews_deleted = purge_cache('url:/reviews/all*')
+        if all_reviews_deleted:
             logger.debug(
-                f'CACHE INVALIDATED: {len(all_reviews_keys)} all-reviews keys'
+                f'CACHE INVALIDATED: {all_reviews_deleted} all-reviews keys'
             )
 
     except Exception as e:
@@ -1,6 +1,7 @@
-import json
+import itertools
 import logging
 
+import orjson
 from flask import Blueprint, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import ValidationError, fields, pre_load, validates
@@ -8,17 +9,132 @@ from marshmallow import ValidationError, fields, pre_load, validates
 from app.extensions import ma
 from app.models import UserFavourite, db
 from app.utils import (
+    bump_cache_version,
+    compile_dumper,
     create_paging,
     delete_place_and_related_data,
     execute_neo4j_query,
+    fill_missing_ratings,
     get_all_subcategories,
     get_all_subtypes,
+    get_cached_listing,
     get_redis,
+    json_response,
+    overall_rating,
+    store_listing,
 )
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint('things_to_do', __name__, url_prefix='/things-to-do')
 
+# List caches are keyed by a generation number, like the hotel lists
+THING_TO_DO_CACHE_NAMESPACE = 'things-to-do'
+
+# Listed thing to do shaped server-side as one map, like the restaurants
+THING_TO_DO_LIST_PROJECTION = """t {
+    .*,
+    element_id: elementId(t),
+    city: head([(t)-[:LOCATED_IN]->(c:City) | c]),
+    subtypes: [(t)-[:HAS_SUBTYPE]->(st:Subtype) | st.name],
+    subcategories: [(t)-[:HAS_SUBCATEGORY]->(sc:Subcategory) | sc.name]
+}"""
+
+# Count and page of the unfiltered listing in one query. The page is
+# collected inside a subquery so the total is returned even when the page
+# is empty.
+_ALL_THINGS_TO_DO_TEMPLATE = """
+MATCH (all_things:ThingToDo)
+WITH count(all_things) AS total_count
+CALL {{
+    MATCH (t:ThingToDo)
+    WITH t
+    ORDER BY t.raw_ranking {sort_order}
+    SKIP $offset
+    LIMIT $size
+    RETURN collect({projection}) AS rows
+}}
+RETURN total_count, rows
+"""
+
+# Count and page of the things to do matched before it, in one query. The
+# matches are collected once so the total and the slice come from the
+# same round trip, and an empty page still returns the total.
+_MATCHED_THINGS_TO_DO_TEMPLATE = """
+WITH t
+ORDER BY t.raw_ranking {sort_order}
+WITH collect(t) AS matched
+RETURN
+    size(matched) AS total_count,
+    [t IN matched[$offset..$offset + $size] | {projection}] AS rows
+"""
+
+# Both sort orders are built up front so the query text stays stable
+ALL_THINGS_TO_DO_QUERIES = {
+    sort_order: _ALL_THINGS_TO_DO_TEMPLATE.format(
+        sort_order=sort_order, projection=THING_TO_DO_LIST_PROJECTION
+    )
+    for sort_order in ('ASC', 'DESC')
+}
+_MATCHED_THINGS_TO_DO_PAGES = {
+    sort_order: _MATCHED_THINGS_TO_DO_TEMPLATE.format(
+        sort_order=sort_order, projection=THING_TO_DO_LIST_PROJECTION
+    )
+    for sort_order in ('ASC', 'DESC')
+}
+SEARCH_THINGS_TO_DO_QUERIES = {
+    sort_order: f"""
+MATCH (t:ThingToDo)
+WHERE toLower(t.name) CONTAINS toLower($search)
+{page}"""
+    for sort_order, page in _MATCHED_THINGS_TO_DO_PAGES.items()
+}
+
+
+def _filter_thing_to_do_query(
+    has_rating, has_subtypes, has_subcategories, sort_order
+):
+    """
+    Build the count and page query for a combination of filters.
+
+    Only the presence of each filter and the sort order change the text,
+    so there are at most 16 variants; all of them are built at import time.
+    """
+    where_clauses = []
+    if has_rating:
+        where_clauses.append('t.rating >= $rating')
+    if has_subtypes:
+        # This clause checks if a place has ALL of the specified subtypes
+        where_clauses.append(
+            'ALL(subtype_name IN $subtypes WHERE (t)-[:HAS_SUBTYPE]->(:Subtype {name: subtype_name}))'
+        )
+    if has_subcategories:
+        # This clause checks if a place has ALL of the specified subcategories
+        where_clauses.append(
+            'ALL(subcategory_name IN $subcategories WHERE (t)-[:HAS_SUBCATEGORY]->(:Subcategory {name: subcategory_name}))'
+        )
+
+    where_str = ''
+    if where_clauses:
+        where_str = 'WHERE ' + ' AND '.join(where_clauses)
+
+    return f"""
+    MATCH (t:ThingToDo)
+    {where_str}
+    {_MATCHED_THINGS_TO_DO_PAGES[sort_order]}
+    """
+
+
+# Filter queries keyed by (has_rating, has_subtypes, has_subcategories,
+# sort_order)
+FILTER_THING_TO_DO_QUERIES = {
+    (*flags, sort_order): _filter_thing_to_do_query(*flags, sort_order)
+    for flags in itertools.product((False, True), repeat=3)
+    for sort_order in ('ASC', 'DESC')
+}
+
+
+CITY_NOT_FOUND_MESSAGE = 'City with this postal code does not exist'
+
 
 class AttachCitySchema(ma.Schema):
     created_at = fields.String(dump_only=True)
@@ -27,19 +143,6 @@ class AttachCitySchema(ma.Schema):
 
     postal_code = fields.String(required=True)
 
-    @validates('postal_code')
-    def validate_postal_code(self, value: str):
-        result = execute_neo4j_query(
-            """
-            MATCH (c:City {postal_code: $postal_code})
-            RETURN c
-            """,
-            {'postal_code': value},
-        )
-        if not result:
-            raise ValidationError('City with this postal code does not exist')
-        return value
-
 
 class ShortThingToDoSchema(ma.Schema):
     created_at = fields.String(dump_only=True)
@@ -71,7 +174,8 @@ class ShortThingToDoSchema(ma.Schema):
             raise ValidationError(
                 'Rating histogram must contain exactly 5 integers'
             )
-        if value and not all(isinstance(i, int) and i >= 0 for i in value):
+        # fields.Integer has already coerced the elements to int
+        if value and min(value) < 0:
             raise ValidationError(
                 'Rating histogram must be a list of 5 non-negative integers'
             )
@@ -90,20 +194,9 @@ class ShortThingToDoSchema(ma.Schema):
             data['rating'] = 0
 
         # Calculate rating from histogram if available
-        if (
-            'rating_histogram' in data
-            and isinstance(data['rating_histogram'], list)
-            and len(data['rating_histogram']) == 5
-        ):
-            rh = data['rating_histogram']
-            total = sum(rh)
-            if total > 0:
-                calculated_rating = (
-                    sum((i + 1) * rh[i] for i in range(5)) / total
-                )
-                data['rating'] = round(calculated_rating, 1)
-            else:
-                data['rating'] = 0
+        rating_histogram = data['rating_histogram']
+        if isinstance(rating_histogram, list) and len(rating_histogram) == 5:
+            data['rating'] = overall_rating(rating_histogram)
 
         return data
 
@@ -118,6 +211,14 @@ class ThingToDoSchema(ShortThingToDoSchema):
     subcategories = fields.List(fields.String(), required=False, default=list)
 
 
+short_thing_to_do_schema = ShortThingToDoSchema()
+thing_to_do_schema = ThingToDoSchema()
+
+
+# Listing pages are dumped through a dumper compiled from the schema
+_dump_short_thing_to_do = compile_dumper(short_thing_to_do_schema)
+
+
 @blueprint.get('/subtypes/')
 def get_subtypes():
     """Get all available subtypes for things to do."""
@@ -132,56 +233,52 @@ def get_subcategories():
     return {'subcategories': subcategories}, 200
 
 
+CREATE_THING_TO_DO_QUERY = """
+MATCH (c:City {postal_code: $postal_code})
+CREATE
+    (t:ThingToDo
+        {
+            name: $name,
+            image: $image,
+            latitude: $latitude,
+            longitude: $longitude,
+            photos: $photos,
+            rating: $rating,
+            rating_histogram: $rating_histogram,
+            raw_ranking: $raw_ranking,
+            description: $description,
+            email: $email,
+            phone: $phone,
+            website: $website,
+            street: $street,
+            type: 'THING-TO-DO',
+            created_at:
+                apoc.date.format(timestamp(), 'ms', 'yyyy-MM-dd HH:mm', 'GMT+7')
+        })
+MERGE (t)-[:LOCATED_IN]->(c)
+FOREACH (subtype IN $subtypes |
+    MERGE (st:Subtype {name: subtype})
+    MERGE (t)-[:HAS_SUBTYPE]->(st)
+)
+FOREACH (subcategory IN $subcategories |
+    MERGE (sc:Subcategory {name: subcategory})
+    MERGE (t)-[:HAS_SUBCATEGORY]->(sc)
+)
+RETURN
+    t,
+    elementId(t) AS element_id,
+    c
+"""
+
+
 @blueprint.post('/')
 def create_thing_to_do():
-    schema = ThingToDoSchema()
-    data = schema.load(request.json)
+    data = thing_to_do_schema.load(request.json)
     city_postal_code = data['city']['postal_code']
 
     # Create the thing to do and attach it to the city in Neo4j
     result = execute_neo4j_query(
-        """
-        MATCH (c:City {postal_code: $postal_code})
-        CREATE
-            (t:ThingToDo
-                {
-                    name: $name,
-                    image: $image,
-                    latitude: $latitude,
-                    longitude: $longitude,
-                    photos: $photos,
-                    rating: $rating,
-                    rating_histogram: $rating_histogram,
-                    raw_ranking: $raw_ranking,
-                    description: $description,
-                    email: $email,
-                    phone: $phone,
-                    website: $website,
-                    street: $street,
-                    type: 'THING-TO-DO',
-                    created_at:
-                        apoc.date.format(timestamp(), 'ms', 'yyyy-MM-dd HH:mm', 'GMT+7')
-                })
-        MERGE (t)-[:LOCATED_IN]->(c)
-
-        // Handle subtypes if provided
-        WITH t, c, $subtypes AS subtypes
-        UNWIND subtypes AS subtype
-        MERGE (st:Subtype {name: subtype})
-        MERGE (t)-[:HAS_SUBTYPE]->(st)
-
-        // Handle subcategories if provided
-        WITH t, c, $subcategories AS subcategories
-        UNWIND subcategories AS subcategory
-        MERGE (sc:Subcategory {name: subcategory})
-        MERGE (t)-[:HAS_SUBCATEGORY]->(sc)
-
-        // Return thing to do with related data
-        RETURN
-            t,
-            elementId(t) AS element_id,
-            c
-        """,
+        CREATE_THING_TO_DO_QUERY,
         {
             'postal_code': city_postal_code,
             'name': data['name'],
@@ -202,19 +299,23 @@ def create_thing_to_do():
         },
     )
 
+    # The query only creates the thing to do when it matches the city, so
+    # no row means the postal code is unknown
     if not result:
-        return {'error': 'Failed to create thing to do.'}, 400
+        raise ValidationError(
+            {'city': {'postal_code': [CITY_NOT_FOUND_MESSAGE]}}
+        )
 
-    # Delete cached thing to do data
-    redis = get_redis()
-    keys_to_delete = redis.keys('things-to-do:*')
-    if keys_to_delete:
-        redis.delete(*keys_to_delete)
+    # Invalidate cached thing to do lists
+    try:
+        bump_cache_version(THING_TO_DO_CACHE_NAMESPACE)
+    except Exception as e:
+        logger.warning('Redis is not available to set data: %s', e)
 
     thing_to_do = result[0]['t']
     thing_to_do['element_id'] = result[0]['element_id']
     thing_to_do['city'] = result[0]['c']
-    return schema.dump(thing_to_do), 201
+    return thing_to_do_schema.dump(thing_to_do), 201
 
 
 @blueprint.get('/')
@@ -279,161 +380,73 @@ def get_things_to_do():
 def _get_all_things_to_do(page, size, offset, user_id, sort_order):
     """Get all things to do with pagination."""
     # Check if the result is cached
-    redis = get_redis()
-    cache_key = f'things-to-do:page={page}:size={size}:order={sort_order}:all'
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            things = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                thing_ids = [t['element_id'] for t in things['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(thing_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for t in things['data']:
-                    t['is_favorite'] = t['element_id'] in favourite_ids
-            else:
-                for t in things['data']:
-                    t['is_favorite'] = False
-            return things, 200
-    except Exception as e:
-        logger.warning('Redis is not available to get data: %s', e)
-
-    # Get the total count of all things to do
-    count_query = 'MATCH (t:ThingToDo) RETURN count(t) AS total_count'
-    total_count_result = execute_neo4j_query(count_query)
-    total_count = total_count_result[0]['total_count']
-
-    # Get all things to do with pagination
-    things_query = f"""
-    MATCH (t:ThingToDo)
-    OPTIONAL MATCH (t)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (t)-[:HAS_SUBTYPE]->(st:Subtype)
-    OPTIONAL MATCH (t)-[:HAS_SUBCATEGORY]->(sc:Subcategory)
-    WITH t, collect(DISTINCT st.name) AS subtypes, collect(DISTINCT sc.name) AS subcategories, c
-    RETURN t, elementId(t) AS element_id, subtypes, subcategories, c AS city
-    ORDER BY t.raw_ranking {sort_order}
-    SKIP $offset
-    LIMIT $size
-    """
+    cache_key, cached = get_cached_listing(
+        THING_TO_DO_CACHE_NAMESPACE,
+        f'page={page}:size={size}:order={sort_order}:all',
+        user_id,
+    )
+    if cached:
+        return cached
 
+    # Count and page in one round trip
     result = execute_neo4j_query(
-        things_query, {'offset': offset, 'size': size}
+        ALL_THINGS_TO_DO_QUERIES[sort_order], {'offset': offset, 'size': size}
     )
+    total_count = result[0]['total_count']
 
     # Process results
-    processed_results = _process_things_to_do_results(result, user_id)
+    processed_results = _process_things_to_do_rows(result[0]['rows'])
 
     # Create paginated response
     response = create_paging(
-        data=ShortThingToDoSchema(many=True).dump(processed_results),
+        data=[_dump_short_thing_to_do(t) for t in processed_results],
         page=page,
         size=size,
         offset=offset,
         total_count=total_count,
     )
 
-    # Cache the response for 6 hours
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
-
-    return response, 200
+    return store_listing(cache_key, response, user_id)
 
 
 def _search_things_to_do(search, page, size, offset, user_id, sort_order):
     """Search things to do by name."""
     # Check if the result is cached
-    redis = get_redis()
-    cache_key = f'things-to-do:page={page}:size={size}:order={sort_order}:search={search}'
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            things = json.loads(cached_response)
-            # Add is_favorite field if user_id exists
-            if user_id:
-                thing_ids = [t['element_id'] for t in things['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(thing_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for t in things['data']:
-                    t['is_favorite'] = t['element_id'] in favourite_ids
-            else:
-                for t in things['data']:
-                    t['is_favorite'] = False
-            return things, 200
-    except Exception as e:
-        logger.warning('Redis is not available to get data: %s', e)
+    cache_key, cached = get_cached_listing(
+        THING_TO_DO_CACHE_NAMESPACE,
+        f'page={page}:size={size}:order={sort_order}:search={search}',
+        user_id,
+    )
+    if cached:
+        return cached
 
     query_params = {'offset': offset, 'size': size, 'search': search}
 
-    # Get the total count of things to do matching the search criteria
-    count_query = """
-    MATCH (t:ThingToDo)
-    WHERE toLower(t.name) CONTAINS toLower($search)
-    RETURN count(t) AS total_count
-    """
-
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = total_count_result[0]['total_count']
-
-    # Get the things to do with pagination
-    things_query = f"""
-    MATCH (t:ThingToDo)
-    WHERE toLower(t.name) CONTAINS toLower($search)
-    OPTIONAL MATCH (t)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (t)-[:HAS_SUBTYPE]->(st:Subtype)
-    OPTIONAL MATCH (t)-[:HAS_SUBCATEGORY]->(sc:Subcategory)
-    WITH t, collect(DISTINCT st.name) AS subtypes, collect(DISTINCT sc.name) AS subcategories, c
-    RETURN t, elementId(t) AS element_id, subtypes, subcategories, c AS city
-    ORDER BY t.raw_ranking {sort_order}
-    SKIP $offset
-    LIMIT $size
-    """
-
-    result = execute_neo4j_query(things_query, query_params)
+    # Count and page in one round trip
+    result = execute_neo4j_query(
+        SEARCH_THINGS_TO_DO_QUERIES[sort_order], query_params
+    )
+    total_count = result[0]['total_count']
 
     # Process results
-    processed_results = _process_things_to_do_results(result, user_id)
+    processed_results = _process_things_to_do_rows(result[0]['rows'])
 
     # Create paginated response
     response = create_paging(
-        data=ShortThingToDoSchema(many=True).dump(processed_results),
+        data=[_dump_short_thing_to_do(t) for t in processed_results],
         page=page,
         size=size,
         offset=offset,
         total_count=total_count,
     )
 
-    # Cache the response for 6 hours
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis is not available to set data: %s', e)
-
-    return response, 200
+    return store_listing(cache_key, response, user_id)
 
 
 def _filter_things_to_do(
     rating, subtypes, subcategories, page, size, offset, user_id, sort_order
 ):
     """Filter things to do by rating and subtypes/subcategories."""
-    redis = get_redis()
-
     # Build a dynamic cache key
     cache_parts = [
         f'page={page}',
@@ -447,153 +460,66 @@ def _filter_things_to_do(
         cache_parts.append(f'subtypes={",".join(sorted(subtypes))}')
     if subcategories:
         cache_parts.append(f'subcategories={",".join(sorted(subcategories))}')
-    cache_key = f'things-to-do:{":".join(cache_parts)}'
 
     # Check Redis cache first
-    try:
-        cached_response = redis.get(cache_key)
-        if cached_response:
-            things = json.loads(cached_response)
-            # Add is_favorite field for authenticated users
-            if user_id:
-                thing_ids = [t['element_id'] for t in things['data']]
-                favourites = (
-                    db.session.query(UserFavourite.place_id)
-                    .filter(
-                        UserFavourite.user_id == user_id,
-                        UserFavourite.place_id.in_(thing_ids),
-                    )
-                    .all()
-                )
-                favourite_ids = set(f[0] for f in favourites)
-                for t in things['data']:
-                    t['is_favorite'] = t['element_id'] in favourite_ids
-            else:
-                for t in things['data']:
-                    t['is_favorite'] = False
-            return things, 200
-    except Exception as e:
-        logger.warning('Redis cache unavailable: %s', e)
+    cache_key, cached = get_cached_listing(
+        THING_TO_DO_CACHE_NAMESPACE, ':'.join(cache_parts), user_id
+    )
+    if cached:
+        return cached
 
-    # Build the query dynamically
+    # Pick the prebuilt query for this combination of filters
     query_params = {'offset': offset, 'size': size}
-    where_clauses = []
-
     if rating is not None:
-        where_clauses.append('t.rating >= $rating')
         query_params['rating'] = rating
     if subtypes:
-        # This clause checks if a place has ALL of the specified subtypes
-        where_clauses.append(
-            'ALL(subtype_name IN $subtypes WHERE (t)-[:HAS_SUBTYPE]->(:Subtype {name: subtype_name}))'
-        )
         query_params['subtypes'] = subtypes
     if subcategories:
-        # This clause checks if a place has ALL of the specified subcategories
-        where_clauses.append(
-            'ALL(subcategory_name IN $subcategories WHERE (t)-[:HAS_SUBCATEGORY]->(:Subcategory {name: subcategory_name}))'
-        )
         query_params['subcategories'] = subcategories
+    things_query = FILTER_THING_TO_DO_QUERIES[
+        (
+            rating is not None,
+            bool(subtypes),
+            bool(subcategories),
+            sort_order,
+        )
+    ]
 
-    where_str = ''
-    if where_clauses:
-        where_str = 'WHERE ' + ' AND '.join(where_clauses)
-
-    # Get the total count of things to do matching the filter
-    count_query = f"""
-    MATCH (t:ThingToDo)
-    {where_str}
-    RETURN count(t) AS total_count
-    """
-    total_count_result = execute_neo4j_query(count_query, query_params)
-    total_count = (
-        total_count_result[0]['total_count'] if total_count_result else 0
-    )
-
-    # Get the things to do with pagination and filter
-    things_query = f"""
-    MATCH (t:ThingToDo)
-    {where_str}
-    OPTIONAL MATCH (t)-[:LOCATED_IN]->(c:City)
-    OPTIONAL MATCH (t)-[:HAS_SUBTYPE]->(st:Subtype)
-    OPTIONAL MATCH (t)-[:HAS_SUBCATEGORY]->(sc:Subcategory)
-    WITH t, c, collect(DISTINCT st.name) AS subtypes, collect(DISTINCT sc.name) AS subcategories
-    RETURN t, elementId(t) AS element_id, subtypes, subcategories, c AS city
-    ORDER BY t.raw_ranking {sort_order}
-    SKIP $offset
-    LIMIT $size
-    """
-
+    # Count and page in one round trip
     result = execute_neo4j_query(things_query, query_params)
+    total_count = result[0]['total_count']
 
     # Process results
-    processed_results = _process_things_to_do_results(result, user_id)
+    processed_results = _process_things_to_do_rows(result[0]['rows'])
 
     # Create paginated response
     response = create_paging(
-        data=ShortThingToDoSchema(many=True).dump(processed_results),
+        data=[_dump_short_thing_to_do(t) for t in processed_results],
         page=page,
         size=size,
         offset=offset,
         total_count=total_count,
     )
 
-    # Cache the result for 6 hours
-    try:
-        redis.set(cache_key, json.dumps(response), ex=21600)
-    except Exception as e:
-        logger.warning('Redis cache set failed: %s', e)
-
-    return response, 200
-
-
-def _process_things_to_do_results(result, user_id):
-    """Process things to do query results."""
-    processed_results = []
-    for record in result:
-        thing = record['t']
-        thing['element_id'] = record['element_id']
-        thing['subtypes'] = record['subtypes']
-        thing['subcategories'] = record['subcategories']
-        if record['city']:
-            thing['city'] = record['city']
-
-        # Calculate rating if not present
-        if 'rating' not in thing or thing['rating'] is None:
-            rh = thing.get('rating_histogram', [])
-            if rh and isinstance(rh, list) and len(rh) == 5:
-                total = sum(rh)
-                if total > 0:
-                    rating = sum((i + 1) * rh[i] for i in range(5)) / total
-                    thing['rating'] = round(rating, 1)
-        processed_results.append(thing)
+    return store_listing(cache_key, response, user_id)
 
-    # Add is_favorite field
-    if user_id:
-        thing_ids = [t['element_id'] for t in processed_results]
-        favourites = (
-            db.session.query(UserFavourite.place_id)
-            .filter(
-                UserFavourite.user_id == user_id,
-                UserFavourite.place_id.in_(thing_ids),
-            )
-            .all()
-        )
-        favourite_ids = set(f[0] for f in favourites)
-        for t in processed_results:
-            t['is_favorite'] = t['element_id'] in favourite_ids
-    else:
-        for t in processed_results:
-            t['is_favorite'] = False
 
-    return processed_results
+def _process_things_to_do_rows(rows):
+    """Finish things to do shaped by THING_TO_DO_LIST_PROJECTION."""
+    for thing in rows:
+        # The schema leaves out a missing city rather than dumping null
+        if thing['city'] is None:
+            del thing['city']
+
+    # Calculate the ratings that are not present
+    fill_missing_ratings(rows)
+
+    return rows
 
 
 @blueprint.get('/<thing_to_do_id>/')
 @jwt_required(optional=True)
 def get_thing_to_do(thing_to_do_id):
-    schema = ThingToDoSchema()
-
     # Check if the user is authenticated
     user_id = None
     try:
@@ -607,21 +533,20 @@ def get_thing_to_do(thing_to_do_id):
     try:
         cached_response = redis.get(cache_key)
         if cached_response:
-            thing_to_do = json.loads(cached_response)
+            thing_to_do = orjson.loads(cached_response)
             # Add is_favorite field
             if user_id:
-                favourite = (
-                    db.session.query(UserFavourite.place_id)
+                thing_to_do['is_favorite'] = db.session.query(
+                    db.session.query(UserFavourite.id)
                     .filter(
                         UserFavourite.user_id == user_id,
                         UserFavourite.place_id == thing_to_do_id,
                     )
-                    .first()
-                )
-                thing_to_do['is_favorite'] = bool(favourite)
+                    .exists()
+                ).scalar()
             else:
                 thing_to_do['is_favorite'] = False
-            return schema.dump(thing_to_do), 200
+            return json_response(thing_to_do_schema.dump(thing_to_do))
     except Exception as e:
         logger.warning('Redis is not available to get data: %s', e)
 
@@ -654,35 +579,28 @@ def get_thing_to_do(thing_to_do_id):
         thing_to_do['city'] = result[0]['city']
 
     # Calculate rating if not present
-    if 'rating' not in thing_to_do or thing_to_do['rating'] is None:
-        rh = thing_to_do.get('rating_histogram', [])
-        if rh and isinstance(rh, list) and len(rh) == 5:
-            total = sum(rh)
-            if total > 0:
-                rating = sum((i + 1) * rh[i] for i in range(5)) / total
-                thing_to_do['rating'] = round(rating, 1)
+    fill_missing_ratings([thing_to_do])
 
     # Add is_favorite field
     if user_id:
-        favourite = (
-            db.session.query(UserFavourite.place_id)
+        thing_to_do['is_favorite'] = db.session.query(
+            db.session.query(UserFavourite.id)
             .filter(
                 UserFavourite.user_id == user_id,
                 UserFavourite.place_id == thing_to_do_id,
             )
-            .first()
-        )
-        thing_to_do['is_favorite'] = bool(favourite)
+            .exists()
+        ).scalar()
     else:
         thing_to_do['is_favorite'] = False
 
     # Cache the response for 6 hours
     try:
-        redis.set(cache_key, json.dumps(thing_to_do), ex=21600)
+        redis.set(cache_key, orjson.dumps(thing_to_do), ex=21600)
     except Exception as e:
         logger.warning('Redis is not available to set data: %s', e)
 
-    return schema.dump(thing_to_do), 200
+    return json_response(thing_to_do_schema.dump(thing_to_do))
 
 
 @blueprint.delete('/<thing_to_do_id>/')
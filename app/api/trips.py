@@ -1,8 +1,8 @@
-import json
 import logging
 import math
 import os
 
+import orjson
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import fields
@@ -11,6 +11,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.extensions import ma
 from app.models import Trip, UserTrip, db
+from app.normalizers import normalize_place
 from app.utils import execute_neo4j_query, get_redis
 
 LIMIT_TRIP = int(os.environ.get('LIMIT_TRIP', 10))
@@ -50,6 +51,10 @@ class TripDetailsSchema(ma.Schema):
     places = fields.List(fields.Nested(TripPlaceSchema), dump_only=True)
 
 
+# Schemas are stateless once built, so share one instance per module
+trip_places_schema = TripPlaceSchema(many=True)
+
+
 # ===== User Trip Endpoints =====
 @blueprint.post('/')
 @jwt_required()
@@ -129,17 +134,21 @@ def get_user_trips():
 
         result = []
 
+        # Fetch the details of every place in every trip at once
+        trip_place_ids = {
+            trip.id: [tp.place_id for tp in trip.trips] for trip in user_trips
+        }
+        place_details = get_place_details_batch(
+            [pid for ids in trip_place_ids.values() for pid in ids]
+        )
+
         for trip in user_trips:
-            trip_places = Trip.query.filter_by(
-                trip_id=trip.id
-            ).all()  # This is another DB query
-            place_ids = [tp.place_id for tp in trip_places]
+            place_ids = trip_place_ids[trip.id]
             number_hotel = number_restaurant = number_thingtodo = 0
 
             if place_ids:
-                # Use cached function instead of direct Neo4j query
                 for place_id in place_ids:
-                    place_info = get_place_details_from_neo4j(place_id)
+                    place_info = place_details.get(place_id)
                     if place_info and 'type' in place_info:
                         place_type = place_info['type']
                         if place_type == 'HOTEL':
@@ -394,11 +403,12 @@ def get_trip_places(trip_id):
                 }
             ), 200
 
-        # Use cached function instead of batch query
+        # Fetch all place details in one batch
+        places_info = get_place_details_batch([p.place_id for p in places])
         place_details = []
         number_hotel = number_restaurant = number_thingtodo = 0
         for place in places:
-            place_info = get_place_details_from_neo4j(place.place_id)
+            place_info = places_info.get(place.place_id)
             if place_info:
                 place_info['order'] = place.order
                 place_info['createdAt'] = place.created_at.isoformat()
@@ -438,7 +448,7 @@ def get_trip_places(trip_id):
                 'numberRestaurant': number_restaurant,
                 'numberThingtodo': number_thingtodo,
             },
-            'places': TripPlaceSchema(many=True).dump(place_details),
+            'places': trip_places_schema.dump(place_details),
         }
 
         return jsonify(result), 200
@@ -555,15 +565,18 @@ def reorder_trip_places(trip_id):
         )
 
         # Return TripPlaceSchema response with place details from Neo4j
+        places_info = get_place_details_batch(
+            [p.place_id for p in updated_places]
+        )
         result = []
         for place in updated_places:
-            place_info = get_place_details_from_neo4j(place.place_id)
+            place_info = places_info.get(place.place_id)
             if place_info:
                 place_info['order'] = place.order
                 place_info['created_at'] = place.created_at.isoformat()
                 result.append(place_info)
 
-        return jsonify(TripPlaceSchema(many=True).dump(result)), 200
+        return jsonify(trip_places_schema.dump(result)), 200
 
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -571,147 +584,110 @@ def reorder_trip_places(trip_id):
         return jsonify({'error': 'Failed to reorder trip places'}), 500
 
 
-def get_place_details_from_neo4j(place_id):
-    """Get place details from Neo4j regardless of place type with caching."""
-    # start_time = time.time()
+def get_place_details_batch(place_ids):
+    """
+    Get details for several places with one Neo4j query.
+
+    Cached places are served from Redis and only the missing ones are
+    fetched. Returns a dict mapping each found place_id to its details.
+    """
+    place_ids = list(dict.fromkeys(place_ids))
+    if not place_ids:
+        return {}
+
+    redis = get_redis()
+    details = {}
 
     # Try to get from cache first
-    cache_key = f'place_details:{place_id}'
     try:
-        cached_data = get_redis().get(cache_key)
-        if cached_data:
-            # execution_time = time.time() - start_time
-            # # logger.info(f"get_place_details_from_neo4j executed in {execution_time:.4f}s for place {place_id} (cache hit)")
-            return json.loads(cached_data)
+        cached_values = redis.mget(
+            [f'place_details:{place_id}' for place_id in place_ids]
+        )
+        for place_id, cached_data in zip(place_ids, cached_values):
+            if cached_data:
+                details[place_id] = orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Failed to get cached place details: {e}')
 
-    # Cache miss - fetch from Neo4j
-    # logger.debug(f"Place details cache miss for place {place_id} - fetching from Neo4j")
+    missing_ids = [pid for pid in place_ids if pid not in details]
+    if not missing_ids:
+        return details
 
-    # First, try to find the place by elementId
+    # Cache miss - fetch all missing places from Neo4j in one query
+    # Only the fields exposed by the short schemas are projected; older
+    # nodes may still use camelCase names for some of them. A missing
+    # rating is averaged from the histogram by Neo4j.
     result = execute_neo4j_query(
         """
         MATCH (p)
-        WHERE elementId(p) = $place_id
+        WHERE elementId(p) IN $place_ids
         OPTIONAL MATCH (p)-[:LOCATED_IN]->(c:City)
-        RETURN p, elementId(p) AS element_id, labels(p) AS types, c
+        WITH p, c, coalesce(p.rating_histogram, p.ratingHistogram) AS rh
+        WITH p, c, rh,
+            CASE WHEN size(rh) = 5
+                THEN rh[0] + rh[1] + rh[2] + rh[3] + rh[4]
+            END AS total
+        RETURN
+            elementId(p) AS element_id,
+            labels(p) AS types,
+            c {.postal_code, .name} AS city,
+            p.email AS email,
+            p.image AS image,
+            p.latitude AS latitude,
+            p.longitude AS longitude,
+            p.name AS name,
+            coalesce(
+                p.rating,
+                CASE WHEN total > 0
+                    THEN round(
+                        toFloat(
+                            rh[0] + 2 * rh[1] + 3 * rh[2] + 4 * rh[3]
+                            + 5 * rh[4]
+                        ) / total,
+                        1
+                    )
+                    ELSE 0.0
+                END
+            ) AS rating,
+            rh AS rating_histogram,
+            coalesce(p.raw_ranking, p.rawRanking) AS raw_ranking,
+            p.street AS street
         """,
-        {'place_id': place_id},
+        {'place_ids': missing_ids},
     )
 
-    if not result:
-        # execution_time = time.time() - start_time
-        logger.warning(
-            f'get_place_details_from_neo4j: place {place_id} not found'
-        )
-        return None
+    fetched = {
+        record['element_id']: normalize_place(record)
+        for record in result or []
+    }
 
-    # Extract the place data and determine its type
-    place_data = result[0]['p']
-    place_data['element_id'] = result[0]['element_id']
-    place_types = result[0]['types']
-    city_data = result[0]['c']
-
-    # Add city data if available (without created_at)
-    if city_data:
-        place_data['city'] = {
-            'postal_code': city_data.get('postal_code', ''),
-            'name': city_data.get('name', ''),
-        }
+    for place_id in missing_ids:
+        if place_id not in fetched:
+            logger.warning(
+                f'get_place_details_batch: place {place_id} not found'
+            )
 
-    # Determine place type and standardize it
-    place_type = None
-    standardized_type = 'UNKNOWN'
-    for type_label in place_types:
-        if type_label == 'Hotel':
-            place_type = type_label
-            standardized_type = 'HOTEL'
-            break
-        elif type_label == 'Restaurant':
-            place_type = type_label
-            standardized_type = 'RESTAURANT'
-            break
-        elif type_label == 'ThingToDo':
-            place_type = type_label
-            standardized_type = 'THING-TO-DO'
-            break
-
-    if not place_type:
-        # Default to the 'type' field if available
-        place_type = place_data.get('type', 'Unknown')
-
-    # Ensure 'type' field is standardized
-    place_data['type'] = standardized_type
-
-    # No need to fetch price_levels as we're not including them in the response
-
-    # Ensure all fields match the expected format in ShortSchemas
-    # Provide default values for any missing fields
-    if (
-        'rating_histogram' not in place_data
-        or not place_data['rating_histogram']
-    ):
-        place_data['rating_histogram'] = [0, 0, 0, 0, 0]
-
-    if 'rating' not in place_data or place_data['rating'] is None:
-        # Calculate rating from histogram if available
-        rh = place_data.get('rating_histogram', [])
-        if rh and isinstance(rh, list) and len(rh) == 5:
-            total = sum(rh)
-            if total > 0:
-                rating = sum((i + 1) * rh[i] for i in range(5)) / total
-                place_data['rating'] = round(rating, 1)
-            else:
-                place_data['rating'] = 0
-        else:
-            place_data['rating'] = 0
-
-    # Convert camelCase keys to snake_case if needed
-    camel_to_snake_mappings = {
-        'ratingHistogram': 'rating_histogram',
-        'rawRanking': 'raw_ranking',
-        'elementId': 'element_id',
-        'createdAt': 'created_at',
-        'updatedAt': 'updated_at',
-    }
+    # Cache the results for 1 hour (place details don't change frequently)
+    if fetched:
+        try:
+            pipe = redis.pipeline()
+            for place_id, place_details in fetched.items():
+                pipe.setex(
+                    f'place_details:{place_id}',
+                    3600,
+                    orjson.dumps(place_details),
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f'Failed to cache place details: {e}')
 
-    for camel, snake in camel_to_snake_mappings.items():
-        if camel in place_data and snake not in place_data:
-            place_data[snake] = place_data[camel]
-
-    # Filter fields to only include those from short schemas (excluding created_at which will be set from Trip)
-    common_fields = [
-        'element_id',
-        'city',
-        'email',
-        'image',
-        'latitude',
-        'longitude',
-        'name',
-        'rating',
-        'rating_histogram',
-        'raw_ranking',
-        'street',
-        'type',
-    ]
-
-    # Create filtered dict with only fields from short schemas
-    filtered_data = {
-        k: place_data.get(k) for k in common_fields if k in place_data
-    }
+    details.update(fetched)
+    return details
 
-    # Cache the result for 1 hour (place details don't change frequently)
-    try:
-        get_redis().setex(cache_key, 3600, json.dumps(filtered_data))
-        # logger.debug(f"Place details cached for place {place_id}")
-    except Exception as e:
-        logger.warning(f'Failed to cache place details: {e}')
 
-    # execution_time = time.time() - start_time
-    # logger.info(f"get_place_details_from_neo4j executed in {execution_time:.4f}s for place {place_id} (cache miss)")
-    # print(f"get_place_details_from_neo4j executed in {execution_time:.4f}s for place {place_id} (cache miss)")
-    return filtered_data
+def get_place_details_from_neo4j(place_id):
+    """Get place details from Neo4j regardless of place type with caching."""
+    return get_place_details_batch([place_id]).get(place_id)
 
 
 @blueprint.delete('/all')
@@ -941,9 +917,10 @@ def optimize_trip(trip_id):
             ), 400
 
         # Get place details from Neo4j
+        places_info = get_place_details_batch([p.place_id for p in places])
         place_details = []
         for place in places:
-            place_info = get_place_details_from_neo4j(place.place_id)
+            place_info = places_info.get(place.place_id)
             if place_info:
                 place_info['trip_place_id'] = str(
                     place.id
@@ -1018,7 +995,7 @@ def optimize_trip(trip_id):
         optimized_places = []
 
         for place in updated_places:
-            place_info = get_place_details_from_neo4j(place.place_id)
+            place_info = places_info.get(place.place_id)
             if place_info:
                 place_info['order'] = place.order
                 optimized_places.append(place_info)
@@ -1046,7 +1023,7 @@ def optimize_trip(trip_id):
                 #     'tspSolving': round(tsp_time, 3)
                 # },
                 'optimizationMethod': tsp_solver_used,
-                'places': TripPlaceSchema(many=True).dump(optimized_places),
+                'places': trip_places_schema.dump(optimized_places),
             }
         ), 200
 
@@ -0,0 +1,23 @@
+import click
+from flask.cli import AppGroup
+
+from .utils import add_price_fields_to_neo4j_hotels, ensure_neo4j_schema
+
+neo4j_cli = AppGroup('neo4j', help='Manage the Neo4j database.')
+
+
+@neo4j_cli.command('init-schema')
+def init_schema():
+    """Create the Neo4j constraints and indexes the queries rely on."""
+    ensure_neo4j_schema()
+
+
+@neo4j_cli.command('migrate-hotel-prices')
+def migrate_hotel_prices():
+    """Store price bounds on hotels that predate them."""
+    result = add_price_fields_to_neo4j_hotels()
+    if 'error' in result:
+        click.echo(f'Migration failed: {result["error"]}')
+    else:
+        click.echo(f'Hotels updated: {result["updated"]}')
+        click.echo(f'Errors: {result["errors"]}')
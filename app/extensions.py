@@ -1,3 +1,5 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail
@@ -15,3 +17,22 @@ cors = CORS(
     resources={r'/api/*': {'origins': '*'}},
     methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
 )
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson.
+
+    Dates and types orjson does not know fall back to Flask's default
+    encoder, so responses look the same as with the stdlib provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
@@ -3,7 +3,7 @@ from datetime import date, datetime
 
 from flask_sqlalchemy import SQLAlchemy
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -70,6 +70,12 @@ class UserFavourite(BaseModel):
         foreign_keys=[user_id],
     )
 
+    # Indexes
+    __table_args__ = (
+        Index('ix_userfav_user_place', 'user_id', 'place_id', unique=True),
+        Index('ix_userfav_user_created', 'user_id', 'created_at'),
+    )
+
     def __init__(self, user_id: uuid.UUID, place_id: str) -> None:
         super().__init__()
         self.user_id = user_id
@@ -0,0 +1,44 @@
+"""
+Pure row normalizers for Neo4j results.
+
+Everything here is free of I/O and fully annotated so the module can be
+compiled with mypyc (`mypyc app/normalizers.py`) without code changes.
+"""
+
+from typing import Any
+
+# Neo4j label -> standardized place type
+PLACE_TYPE_MAP: dict[str, str] = {
+    'Hotel': 'HOTEL',
+    'Restaurant': 'RESTAURANT',
+    'ThingToDo': 'THING-TO-DO',
+}
+
+
+def normalize_place(record: dict[str, Any]) -> dict[str, Any]:
+    """
+    Shape a projected Neo4j place row into the trip place format.
+
+    The query has already filled in a missing rating from the histogram.
+    """
+    place_data: dict[str, Any] = dict(record)
+    place_types: list[str] = place_data.pop('types')
+
+    # Only keep the city when the place is attached to one
+    if not place_data['city']:
+        del place_data['city']
+
+    # Determine place type and standardize it
+    standardized_type = 'UNKNOWN'
+    for label in place_types:
+        mapped = PLACE_TYPE_MAP.get(label)
+        if mapped is not None:
+            standardized_type = mapped
+            break
+    place_data['type'] = standardized_type
+
+    # Provide a default histogram for places without reviews
+    if not place_data['rating_histogram']:
+        place_data['rating_histogram'] = [0, 0, 0, 0, 0]
+
+    return place_data
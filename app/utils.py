@@ -1,9 +1,29 @@
-import json
 import logging
 import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for work that should not block the HTTP response
+_background_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix='background'
+)
+
+# Pool used to run independent Neo4j queries side by side
+_query_executor = ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix='neo4j-query'
+)
+
+# Process-wide Neo4j driver, created lazily by get_neo4j_driver()
+_neo4j_driver = None
+_neo4j_driver_lock = threading.Lock()
+
 
 def create_paging(
     data: list, page: int, size: int, offset: int, total_count: int
@@ -22,6 +42,40 @@ def create_paging(
     }
 
 
+def json_response(data, status: int = 200):
+    """Serialize ``data`` with orjson and wrap it in a JSON response."""
+    from flask import current_app
+
+    return current_app.response_class(
+        orjson.dumps(data), status=status, mimetype='application/json'
+    )
+
+
+def json_body_response(body, status: int = 200):
+    """Wrap an already serialized JSON body in a response."""
+    from flask import current_app
+
+    return current_app.response_class(
+        body, status=status, mimetype='application/json'
+    )
+
+
+def conditional_response(response):
+    """Tag a response with an ETag and answer 304 if the client has it.
+
+    Clients are asked to revalidate every time, so a write still shows
+    up on the next request. Outside a request, as when warming caches,
+    the response is returned untouched.
+    """
+    from flask import has_request_context, request
+
+    if not has_request_context():
+        return response
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
 def create_paging_metadata(
     offset: int, page: int, page_count: int, size: int, total_count: int
 ):
@@ -35,23 +89,228 @@ def create_paging_metadata(
     }
 
 
+def compile_dumper(schema):
+    """Build a plain function that dumps dicts the way ``schema`` does.
+
+    The function is generated once from the schema's dump fields, so the
+    per-item work is a dict copy with no field dispatch. Float and Integer
+    values are coerced inline and strings pass through; other fields, and
+    strings of other types, go through the field's own serializer, so the
+    output matches ``schema.dump()``. Keys follow the schema's declaration
+    order and defaults, and nested schemas are compiled the same way.
+    """
+    from marshmallow import fields, missing
+
+    namespace = {}
+    lines = ['def dump(obj):', '    data = {}']
+    for name, field in schema.dump_fields.items():
+        source = field.attribute or name
+        key = field.data_key or name
+        serializer = f'_serialize_{name}'
+        namespace[serializer] = field._serialize
+        if isinstance(field, fields.Nested):
+            dumper = f'_dump_{name}'
+            namespace[dumper] = compile_dumper(field.schema)
+            if field.many:
+                value = f'None if v is None else [{dumper}(i) for i in v]'
+            else:
+                value = f'None if v is None else {dumper}(v)'
+        elif isinstance(field, fields.Float) and not field.as_string:
+            value = 'None if v is None else float(v)'
+        elif isinstance(field, fields.Integer) and not field.as_string:
+            value = 'None if v is None else int(v)'
+        elif isinstance(field, fields.String):
+            value = (
+                f'v if v is None or v.__class__ is str '
+                f'else {serializer}(v, {name!r}, obj)'
+            )
+        else:
+            value = f'{serializer}(v, {name!r}, obj)'
+
+        default = field.dump_default
+        lines.append(f'    if {source!r} in obj:')
+        lines.append(f'        v = obj[{source!r}]')
+        if default is missing:
+            lines.append(f'        data[{key!r}] = {value}')
+            continue
+        default_name = f'_default_{name}'
+        namespace[default_name] = default
+        if callable(default):
+            default_name += '()'
+        # Like marshmallow, the default goes through the field as well
+        lines.append('    else:')
+        lines.append(f'        v = {default_name}')
+        lines.append(f'    data[{key!r}] = {value}')
+    lines.append('    return data')
+
+    source_name = f'<dumper {type(schema).__name__}>'
+    exec(compile('\n'.join(lines), source_name, 'exec'), namespace)
+    return namespace['dump']
+
+
+def get_neo4j_driver():
+    """
+    Return the shared Neo4j driver, creating it on first use.
+
+    The driver owns a connection pool and is safe to share between threads,
+    so it is created once per process instead of once per query.
+    """
+    global _neo4j_driver
+
+    if _neo4j_driver is None:
+        with _neo4j_driver_lock:
+            if _neo4j_driver is None:
+                import atexit
+
+                from neo4j import GraphDatabase
+
+                from .environments import (
+                    NEO4J_MAX_POOL_SIZE,
+                    NEO4J_PASSWORD,
+                    NEO4J_URI,
+                    NEO4J_USERNAME,
+                )
+
+                _neo4j_driver = GraphDatabase.driver(
+                    NEO4J_URI,
+                    auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
+                    max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+                    max_connection_lifetime=3000,
+                    connection_acquisition_timeout=30,
+                )
+                atexit.register(_neo4j_driver.close)
+
+    return _neo4j_driver
+
+
 def execute_neo4j_query(query: str, params: dict = None):
-    from neo4j import GraphDatabase
+    """
+    Run a Cypher query and return its records as plain dicts.
 
-    from .environments import NEO4J_PASSWORD, NEO4J_URI, NEO4J_USERNAME
+    Nodes are converted to dicts of their properties, so callers never have
+    to deal with driver ``Node``/``Record`` objects.
+    """
+    from .environments import NEO4J_DATABASE
 
-    driver = GraphDatabase.driver(
-        NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD)
-    )
-    try:
-        with driver.session() as session:
-            result = session.run(query, params)
-            if 'RETURN' in query.upper():
-                return result.data()
-    except Exception as e:
-        raise e
-    finally:
-        driver.close()
+    with get_neo4j_driver().session(database=NEO4J_DATABASE) as session:
+        result = session.run(query, params)
+        if 'RETURN' in query.upper():
+            return [record.data() for record in result]
+
+
+def execute_neo4j_read(query: str, params: dict = None):
+    """
+    Run a read query in a managed read transaction and return its records.
+
+    Read sessions let a clustered Neo4j route the query to a follower, and
+    the driver retries the transaction on transient errors.
+    """
+    from neo4j import READ_ACCESS
+
+    from .environments import NEO4J_DATABASE
+
+    def work(tx):
+        return [record.data() for record in tx.run(query, params)]
+
+    with get_neo4j_driver().session(
+        database=NEO4J_DATABASE, default_access_mode=READ_ACCESS
+    ) as session:
+        return session.execute_read(work)
+
+
+def execute_neo4j_write(query: str, params: dict = None):
+    """
+    Run a write query in a managed transaction and return its records.
+
+    Unlike the auto-commit run in execute_neo4j_query(), the driver retries
+    the whole transaction on transient errors such as deadlocks, which
+    batched writes that MERGE shared nodes can run into.
+    """
+    from .environments import NEO4J_DATABASE
+
+    def work(tx):
+        return [record.data() for record in tx.run(query, params)]
+
+    with get_neo4j_driver().session(database=NEO4J_DATABASE) as session:
+        return session.execute_write(work)
+
+
+# Constraints backing the MATCH and MERGE keys used when places are
+# created. Each uniqueness constraint also provides the index the lookups
+# use. elementId() lookups resolve by node id and need no index.
+NEO4J_SCHEMA_QUERIES = (
+    'CREATE CONSTRAINT city_postal_code_unique IF NOT EXISTS '
+    'FOR (c:City) REQUIRE c.postal_code IS UNIQUE',
+    'CREATE CONSTRAINT feature_name_unique IF NOT EXISTS '
+    'FOR (f:Feature) REQUIRE f.name IS UNIQUE',
+    'CREATE CONSTRAINT price_level_level_unique IF NOT EXISTS '
+    'FOR (pl:PriceLevel) REQUIRE pl.level IS UNIQUE',
+    'CREATE CONSTRAINT hotel_class_name_unique IF NOT EXISTS '
+    'FOR (hc:HotelClass) REQUIRE hc.name IS UNIQUE',
+    'CREATE CONSTRAINT meal_type_name_unique IF NOT EXISTS '
+    'FOR (mt:MealType) REQUIRE mt.name IS UNIQUE',
+    'CREATE CONSTRAINT cuisine_name_unique IF NOT EXISTS '
+    'FOR (cu:Cuisine) REQUIRE cu.name IS UNIQUE',
+    'CREATE CONSTRAINT subtype_name_unique IF NOT EXISTS '
+    'FOR (st:Subtype) REQUIRE st.name IS UNIQUE',
+    'CREATE CONSTRAINT subcategory_name_unique IF NOT EXISTS '
+    'FOR (sc:Subcategory) REQUIRE sc.name IS UNIQUE',
+    # Backs the hotel listing order and its keyset cursor
+    'CREATE INDEX hotel_raw_ranking IF NOT EXISTS '
+    'FOR (h:Hotel) ON (h.raw_ranking)',
+    # Back the hotel rating and price filters
+    'CREATE INDEX hotel_rating IF NOT EXISTS FOR (h:Hotel) ON (h.rating)',
+    'CREATE INDEX hotel_min_price IF NOT EXISTS '
+    'FOR (h:Hotel) ON (h.min_price)',
+    'CREATE INDEX hotel_max_price IF NOT EXISTS '
+    'FOR (h:Hotel) ON (h.max_price)',
+    # Back the restaurant and thing-to-do listing order
+    'CREATE INDEX restaurant_raw_ranking IF NOT EXISTS '
+    'FOR (r:Restaurant) ON (r.raw_ranking)',
+    'CREATE INDEX thing_to_do_raw_ranking IF NOT EXISTS '
+    'FOR (t:ThingToDo) ON (t.raw_ranking)',
+    # Back the restaurant and thing-to-do rating filters
+    'CREATE INDEX restaurant_rating IF NOT EXISTS '
+    'FOR (r:Restaurant) ON (r.rating)',
+    'CREATE INDEX thing_to_do_rating IF NOT EXISTS '
+    'FOR (t:ThingToDo) ON (t.rating)',
+)
+
+
+def ensure_neo4j_schema():
+    """Create the Neo4j constraints and indexes the queries rely on."""
+    from neo4j.exceptions import ServiceUnavailable
+
+    for query in NEO4J_SCHEMA_QUERIES:
+        try:
+            execute_neo4j_query(query)
+        except ServiceUnavailable as e:
+            # The remaining statements would each wait out the same timeout
+            logger.error('Neo4j is not available to apply the schema: %s', e)
+            return
+        except Exception as e:
+            logger.warning(f'Failed to apply Neo4j schema "{query}": {e}')
+
+
+def execute_neo4j_queries_concurrently(*queries):
+    """
+    Run independent read queries in parallel and return their results.
+
+    Each argument is a ``(query, params)`` tuple. Results come back in the
+    same order, so the total latency is that of the slowest query rather
+    than the sum of all of them.
+    """
+    futures = [submit_neo4j_query(query, params) for query, params in queries]
+    return [future.result() for future in futures]
+
+
+def submit_neo4j_query(query: str, params: dict = None):
+    """
+    Start a read query on the query pool and return its Future.
+
+    Lets a view do other I/O, such as a SQL lookup, while Neo4j works.
+    """
+    return _query_executor.submit(execute_neo4j_read, query, params)
 
 
 def send_async_email(recipients: list[str], subject: str, html: str):
@@ -76,12 +335,261 @@ def send_async_email(recipients: list[str], subject: str, html: str):
     thread.start()
 
 
+def run_in_background(func, *args, **kwargs):
+    """
+    Run a function on the background pool inside the application context.
+
+    Errors are logged instead of being raised, since nobody waits for the
+    result.
+    """
+    from . import AppContext
+
+    def task():
+        app = AppContext().get_app()
+        with app.app_context():
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(
+                    f'Background task {func.__name__} failed: {str(e)}'
+                )
+
+    return _background_executor.submit(task)
+
+
 def get_redis():
     from . import AppContext
 
     return AppContext().get_redis()
 
 
+# Resolves a versioned cache key and reads it in a single round trip.
+# KEYS[1] is the version counter, ARGV[1] the namespace, ARGV[2] the key
+# suffix. Returns the key for the current version and its value.
+_VERSIONED_GET_LUA = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local key = ARGV[1] .. ':v' .. version .. ':' .. ARGV[2]
+return {key, redis.call('GET', key)}
+"""
+_versioned_get_script = None
+
+
+def get_versioned_cache(namespace: str, suffix: str):
+    """
+    Read a cache entry keyed under the namespace's current version.
+
+    The namespace version lives in '{namespace}:ver'; bumping it with INCR
+    invalidates every entry at once.
+
+    Returns:
+        tuple: (cache_key, cached value or None). The key is the one to
+        write the entry under when the value is missing.
+    """
+    global _versioned_get_script
+
+    try:
+        if _versioned_get_script is None:
+            _versioned_get_script = get_redis().register_script(
+                _VERSIONED_GET_LUA
+            )
+        cache_key, cached = _versioned_get_script(
+            keys=[f'{namespace}:ver'], args=[namespace, suffix]
+        )
+        return cache_key, cached
+    except Exception as e:
+        logger.warning('Redis is not available to get data: %s', e)
+        return f'{namespace}:v0:{suffix}', None
+
+
+def bump_cache_version(namespace: str) -> int:
+    """
+    Invalidate every versioned entry of a namespace at once.
+
+    Old entries are not deleted; they expire through their TTL.
+
+    Returns:
+        int: The new version
+    """
+    return get_redis().incr(f'{namespace}:ver')
+
+
+# Singleflight for cache rebuilds: one worker holds '{cache_key}:lock'
+# while it rebuilds an entry and the others wait for the result
+CACHE_LOCK_TTL = 10
+
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release_lock_script = None
+
+
+def acquire_cache_lock(cache_key: str, ttl: int = CACHE_LOCK_TTL):
+    """
+    Try to become the one worker rebuilding a cache entry.
+
+    Returns:
+        str | None: Token to release the lock with, or None if another
+        worker holds it. A token is also returned when Redis is down, so
+        the caller still builds the entry.
+    """
+    token = uuid.uuid4().hex
+    try:
+        if not get_redis().set(f'{cache_key}:lock', token, nx=True, ex=ttl):
+            return None
+    except Exception as e:
+        logger.warning('Redis is not available to set data: %s', e)
+    return token
+
+
+def release_cache_lock(cache_key: str, token: str) -> None:
+    """Release a rebuild lock unless it expired and was taken by another."""
+    global _release_lock_script
+
+    try:
+        if _release_lock_script is None:
+            _release_lock_script = get_redis().register_script(
+                _RELEASE_LOCK_LUA
+            )
+        _release_lock_script(keys=[f'{cache_key}:lock'], args=[token])
+    except Exception as e:
+        logger.warning('Redis is not available to delete data: %s', e)
+
+
+def wait_for_cache(
+    cache_key: str, timeout: float = 2.0, interval: float = 0.1
+):
+    """
+    Poll for a cache entry that another worker is rebuilding.
+
+    Returns:
+        The cached value, or None if it did not appear within ``timeout``.
+    """
+    redis = get_redis()
+    for _ in range(int(timeout / interval)):
+        time.sleep(interval)
+        try:
+            cached = redis.get(cache_key)
+        except Exception as e:
+            logger.warning('Redis is not available to get data: %s', e)
+            return None
+        if cached:
+            return cached
+    return None
+
+
+# Keys per UNLINK command when purging, small enough that no single
+# command holds Redis up
+PURGE_UNLINK_BATCH = 128
+
+
+def purge_cache(pattern: str, count: int = 500) -> int:
+    """
+    Delete every key matching a pattern without blocking Redis.
+
+    Walks the keyspace with SCAN instead of KEYS and removes the matches
+    with UNLINK, which frees memory in a background thread. Keys are
+    unlinked PURGE_UNLINK_BATCH at a time, and the pipeline is flushed
+    every ``count`` keys so a large purge never buffers the whole match
+    set. The pipeline is not wrapped in MULTI/EXEC, as the deletes need
+    no atomicity.
+
+    Returns:
+        int: Number of keys removed
+    """
+    redis = get_redis()
+    pipe = redis.pipeline(transaction=False)
+    batch = []
+    deleted = 0
+    pending = 0
+    cursor = 0
+    while True:
+        cursor, keys = redis.scan(cursor, match=pattern, count=count)
+        batch.extend(keys)
+        while len(batch) >= PURGE_UNLINK_BATCH:
+            pipe.unlink(*batch[:PURGE_UNLINK_BATCH])
+            del batch[:PURGE_UNLINK_BATCH]
+            deleted += PURGE_UNLINK_BATCH
+            pending += PURGE_UNLINK_BATCH
+        if pending >= count:
+            pipe.execute()
+            pending = 0
+        if cursor == 0:
+            break
+    if batch:
+        pipe.unlink(*batch)
+        deleted += len(batch)
+    pipe.execute()
+    return deleted
+
+
+def set_tracked_cache(index_key: str, cache_key: str, value, ttl: int):
+    """
+    Cache a value and record its key in the index set ``index_key``.
+
+    The index lives as long as its newest entry, so the entries can be
+    dropped with purge_tracked_cache() instead of scanning the keyspace.
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.set(cache_key, value, ex=ttl)
+    pipe.sadd(index_key, cache_key)
+    pipe.expire(index_key, ttl)
+    pipe.execute()
+
+
+def purge_tracked_cache(index_key: str) -> int:
+    """
+    Delete every entry recorded in an index set, and the index itself.
+
+    The index is read and removed atomically, so an entry cached while
+    the purge runs starts a new index instead of being lost.
+
+    Returns:
+        int: Number of keys removed
+    """
+    redis = get_redis()
+    pipe = redis.pipeline()
+    pipe.smembers(index_key)
+    pipe.unlink(index_key)
+    keys = list(pipe.execute()[0])
+
+    pipe = redis.pipeline(transaction=False)
+    for start in range(0, len(keys), PURGE_UNLINK_BATCH):
+        pipe.unlink(*keys[start : start + PURGE_UNLINK_BATCH])
+    return sum(pipe.execute())
+
+
+# Removes the old rating from a place's histogram, adds the new one, and
+# recomputes the average from the result. Either rating may be null; a
+# bucket never drops below zero.
+UPDATE_RATING_HISTOGRAM_QUERY = """
+MATCH (p)
+WHERE elementId(p) = $place_id
+WITH p, coalesce(p.rating_histogram, [0, 0, 0, 0, 0]) AS hist
+WITH p, [i IN range(0, 4) |
+    hist[i]
+    - CASE WHEN $old_rating = i + 1 AND hist[i] > 0 THEN 1 ELSE 0 END
+    + CASE WHEN $new_rating = i + 1 THEN 1 ELSE 0 END
+] AS hist
+WITH p, hist, hist[0] + hist[1] + hist[2] + hist[3] + hist[4] AS total
+SET
+    p.rating_histogram = hist,
+    p.rating = CASE
+        WHEN total > 0
+        THEN round(
+            toFloat(
+                hist[0] + 2 * hist[1] + 3 * hist[2] + 4 * hist[3] + 5 * hist[4]
+            ) / total,
+            1
+        )
+        ELSE 0.0
+    END
+RETURN p.rating AS rating, p.rating_histogram AS rating_histogram
+"""
+
+
 def update_place_rating_histogram(
     place_id: str, old_rating: float = None, new_rating: float = None
 ):
@@ -100,59 +608,15 @@ def update_place_rating_histogram(
         if new_rating is not None:
             new_rating = int(round(new_rating))
 
-        # If updating or deleting, first decrement the old rating
-        if old_rating is not None:
-            execute_neo4j_query(
-                """
-                MATCH (p)
-                WHERE elementId(p) = $place_id
-                WITH p,
-                     CASE WHEN p.rating_histogram IS NULL THEN [0,0,0,0,0] ELSE p.rating_histogram END as hist
-                SET p.rating_histogram = [
-                    CASE WHEN $rating = 1 AND hist[0] > 0 THEN hist[0] - 1 ELSE hist[0] END,
-                    CASE WHEN $rating = 2 AND hist[1] > 0 THEN hist[1] - 1 ELSE hist[1] END,
-                    CASE WHEN $rating = 3 AND hist[2] > 0 THEN hist[2] - 1 ELSE hist[2] END,
-                    CASE WHEN $rating = 4 AND hist[3] > 0 THEN hist[3] - 1 ELSE hist[3] END,
-                    CASE WHEN $rating = 5 AND hist[4] > 0 THEN hist[4] - 1 ELSE hist[4] END
-                ]
-                """,
-                {'place_id': place_id, 'rating': old_rating},
-            )
-
-        # If creating or updating, increment the new rating
-        if new_rating is not None:
-            execute_neo4j_query(
-                """
-                MATCH (p)
-                WHERE elementId(p) = $place_id
-                WITH p,
-                     CASE WHEN p.rating_histogram IS NULL THEN [0,0,0,0,0] ELSE p.rating_histogram END as hist
-                SET p.rating_histogram = [
-                    CASE WHEN $rating = 1 THEN hist[0] + 1 ELSE hist[0] END,
-                    CASE WHEN $rating = 2 THEN hist[1] + 1 ELSE hist[1] END,
-                    CASE WHEN $rating = 3 THEN hist[2] + 1 ELSE hist[2] END,
-                    CASE WHEN $rating = 4 THEN hist[3] + 1 ELSE hist[3] END,
-                    CASE WHEN $rating = 5 THEN hist[4] + 1 ELSE hist[4] END
-                ]
-                """,
-                {'place_id': place_id, 'rating': new_rating},
-            )
-
-        # Update the average rating
-        execute_neo4j_query(
-            """
-            MATCH (p)
-            WHERE elementId(p) = $place_id
-            WITH p,
-                 CASE WHEN p.rating_histogram IS NULL THEN [0,0,0,0,0] ELSE p.rating_histogram END as hist
-            SET p.rating = CASE
-                WHEN reduce(total = 0, x IN hist | total + x) > 0
-                THEN round(toFloat(reduce(total = 0, i IN range(0, 4) | total + (i + 1) * hist[i])) / toFloat(reduce(total = 0, x IN hist | total + x)), 1)
-                ELSE 0.0
-            END
-            RETURN p.rating, p.rating_histogram
-            """,
-            {'place_id': place_id},
+        # Move the review between buckets and recompute the average in one
+        # transaction, matching the place only once
+        execute_neo4j_write(
+            UPDATE_RATING_HISTOGRAM_QUERY,
+            {
+                'place_id': place_id,
+                'old_rating': old_rating,
+                'new_rating': new_rating,
+            },
         )
 
         return True
@@ -161,6 +625,51 @@ def update_place_rating_histogram(
         return False
 
 
+def overall_rating(rating_histogram: list) -> float:
+    """
+    Average a 5-bucket rating histogram, 0 when there are no reviews.
+
+    Used by the place schemas to derive the rating they store.
+    """
+    rh = rating_histogram
+    total = rh[0] + rh[1] + rh[2] + rh[3] + rh[4]
+    if total <= 0:
+        return 0
+    weighted = rh[0] + 2 * rh[1] + 3 * rh[2] + 4 * rh[3] + 5 * rh[4]
+    return round(weighted / total, 1)
+
+
+# Star weights used to average a 5-bucket rating histogram
+_RATING_WEIGHTS = np.arange(1, 6, dtype=np.float64)
+
+
+def fill_missing_ratings(places: list[dict]) -> None:
+    """
+    Derive a missing rating from the rating histogram, in place.
+
+    The histograms of every place without a rating are averaged in a
+    single NumPy pass. Places without reviews keep no rating.
+    """
+    pending = [
+        place
+        for place in places
+        if place.get('rating') is None
+        and isinstance(place.get('rating_histogram'), list)
+        and len(place['rating_histogram']) == 5
+    ]
+    if not pending:
+        return
+
+    histograms = np.array(
+        [place['rating_histogram'] for place in pending], dtype=np.float64
+    )
+    totals = histograms.sum(axis=1)
+    ratings = np.round(histograms @ _RATING_WEIGHTS / np.maximum(totals, 1), 1)
+    for place, total, rating in zip(pending, totals, ratings.tolist()):
+        if total > 0:
+            place['rating'] = rating
+
+
 def check_place_exists(place_id: str) -> bool:
     """
     Check if a place exists in Neo4j database.
@@ -186,6 +695,192 @@ def check_place_exists(place_id: str) -> bool:
         return False
 
 
+# Each user's favourite place ids are cached as a Redis set. The empty
+# member keeps users without favourites cached too.
+FAVOURITES_CACHE_TTL = 3600
+_FAVOURITES_SENTINEL = ''
+
+# Fills the favourites set only if it is still missing and no change was
+# made since the reader looked. KEYS[1] is the set, KEYS[2] the user's
+# generation counter; ARGV[1] is the generation seen before reading
+# Postgres, ARGV[2] the TTL and the rest the members.
+_FILL_FAVOURITES_LUA = """
+local generation = redis.call('GET', KEYS[2]) or '0'
+if generation ~= ARGV[1] or redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('SADD', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+_fill_favourites_script = None
+
+
+def _favourites_cache_key(user_id) -> str:
+    return f'user:{user_id}:favs'
+
+
+def _favourites_generation_key(user_id) -> str:
+    return f'user:{user_id}:favs:gen'
+
+
+def get_favourite_ids(user_id, place_ids: list[str]) -> set[str]:
+    """
+    Return the subset of place_ids the user has marked as favourite.
+
+    Reads through the user's cached favourites set; a hit costs one Redis
+    round trip and no Postgres query. A miss refills the set unless the
+    favourites changed while Postgres was being read.
+    """
+    global _fill_favourites_script
+
+    if not place_ids:
+        return set()
+
+    redis = get_redis()
+    cache_key = _favourites_cache_key(user_id)
+    generation_key = _favourites_generation_key(user_id)
+    generation = None
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.exists(cache_key)
+        pipe.smismember(cache_key, place_ids)
+        pipe.get(generation_key)
+        cached, flags, generation = pipe.execute()
+        if cached:
+            return {
+                place_id for place_id, flag in zip(place_ids, flags) if flag
+            }
+    except Exception as e:
+        logger.warning('Redis is not available to get data: %s', e)
+
+    from app.models import UserFavourite, db
+
+    favourite_ids = set(
+        db.session.scalars(
+            db.select(UserFavourite.place_id).filter(
+                UserFavourite.user_id == user_id
+            )
+        )
+    )
+    try:
+        if _fill_favourites_script is None:
+            _fill_favourites_script = redis.register_script(
+                _FILL_FAVOURITES_LUA
+            )
+        _fill_favourites_script(
+            keys=[cache_key, generation_key],
+            args=[
+                generation or '0',
+                FAVOURITES_CACHE_TTL,
+                _FAVOURITES_SENTINEL,
+                *favourite_ids,
+            ],
+        )
+    except Exception as e:
+        logger.warning('Redis is not available to set data: %s', e)
+
+    return favourite_ids.intersection(place_ids)
+
+
+def invalidate_favourite_ids(*user_ids) -> None:
+    """
+    Drop the cached favourites of the given users.
+
+    Call it after the change is committed. Bumping each user's generation
+    stops a reader that loaded the old favourites from caching them again.
+    """
+    if not user_ids:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for user_id in user_ids:
+            generation_key = _favourites_generation_key(user_id)
+            pipe.incr(generation_key)
+            pipe.expire(generation_key, FAVOURITES_CACHE_TTL)
+            pipe.unlink(_favourites_cache_key(user_id))
+        pipe.execute()
+    except Exception as e:
+        logger.warning('Redis is not available to delete data: %s', e)
+
+
+# Byte patterns used to patch is_favorite into serialized listing pages
+_ELEMENT_ID_RE = re.compile(rb'"element_id":"([^"]+)"')
+_NOT_FAVOURITE = b'"is_favorite":false'
+_FAVOURITE = b'"is_favorite":true'
+
+
+def _splice_favourites(body: bytes, favourite_ids) -> bytes:
+    """
+    Set is_favorite to true for the given places in a serialized page.
+
+    The listing dumpers write element_id before is_favorite, so the first
+    false flag after a place's element_id is that place's. JSON escapes
+    quotes inside strings, so neither pattern can match inside a value.
+    """
+    for place_id in favourite_ids:
+        start = body.find(b'"element_id":' + orjson.dumps(place_id))
+        if start == -1:
+            continue
+        flag = body.find(_NOT_FAVOURITE, start)
+        if flag == -1:
+            continue
+        body = body[:flag] + _FAVOURITE + body[flag + len(_NOT_FAVOURITE) :]
+    return body
+
+
+def listing_response(body, user_id):
+    """
+    Build the response for the current user from a serialized listing.
+
+    Listings are serialized with every is_favorite false, so anonymous
+    requests get the body as-is. For signed-in users the flags of their
+    favourites are flipped in the serialized body instead of decoding
+    and re-encoding the page.
+    """
+    if not user_id:
+        return json_body_response(body)
+
+    if isinstance(body, str):
+        body = body.encode()
+    place_ids = [match.decode() for match in _ELEMENT_ID_RE.findall(body)]
+    favourite_ids = get_favourite_ids(user_id, place_ids)
+    return json_body_response(_splice_favourites(body, favourite_ids))
+
+
+def get_cached_listing(namespace: str, suffix: str, user_id):
+    """
+    Read a versioned listing page and build the response for the user.
+
+    Returns:
+        tuple: (cache_key, response or None). The response is None on a
+        miss or when Redis is unavailable; the key is the one to cache the
+        page under.
+    """
+    cache_key, cached_response = get_versioned_cache(namespace, suffix)
+    if not cached_response:
+        return cache_key, None
+    return cache_key, listing_response(cached_response, user_id)
+
+
+def store_listing(cache_key: str, response: dict, user_id, store=None):
+    """
+    Cache a rebuilt listing page and build the response for the user.
+
+    The page is serialized once for both the cache and the response, and
+    cached for 6 hours without holding up the response. ``store``, when
+    given, replaces that cache write and is called with the serialized
+    page.
+    """
+    payload = orjson.dumps(response)
+    if store is None:
+        run_in_background(get_redis().set, cache_key, payload, ex=21600)
+    else:
+        run_in_background(store, payload)
+
+    return listing_response(payload, user_id)
+
+
 def update_user_preference_cache(user_id: str):
     """
     Update cached user preferences when user adds favorites or reviews.
@@ -198,12 +893,10 @@ def update_user_preference_cache(user_id: str):
         redis = get_redis()
 
         # Clear cached recommendations for this user
-        pattern = f'recommendations:{user_id}:*'
-        keys_to_delete = redis.keys(pattern)
-        if keys_to_delete:
-            redis.delete(*keys_to_delete)
+        deleted = purge_tracked_cache(f'recommendations:{user_id}:keys')
+        if deleted:
             logger.info(
-                f'Cleared {len(keys_to_delete)} cached recommendations for user {user_id}'
+                f'Cleared {deleted} cached recommendations for user {user_id}'
             )
 
         # Optionally pre-compute and cache user preferences
@@ -239,7 +932,7 @@ def update_user_preference_cache(user_id: str):
         }
 
         redis.setex(
-            f'user_summary:{user_id}', 3600, json.dumps(interaction_summary)
+            f'user_summary:{user_id}', 3600, orjson.dumps(interaction_summary)
         )
 
         return True
@@ -302,12 +995,14 @@ def delete_place_and_related_data(place_id: str) -> dict:
             )
 
         # 2. Delete user favorites from PostgreSQL
+        favourite_user_ids = []
         try:
-            favorites_deleted = (
-                db.session.query(UserFavourite)
+            favourite_user_ids = db.session.scalars(
+                db.delete(UserFavourite)
                 .filter_by(place_id=place_id)
-                .delete()
-            )
+                .returning(UserFavourite.user_id)
+            ).all()
+            favorites_deleted = len(favourite_user_ids)
             deletion_summary['favorites_deleted'] = favorites_deleted
             logger.info(
                 f'Deleted {favorites_deleted} favorites for place {place_id}'
@@ -337,6 +1032,8 @@ def delete_place_and_related_data(place_id: str) -> dict:
         # Commit PostgreSQL changes
         try:
             db.session.commit()
+            # Only drop cached favourites once the delete is visible
+            invalidate_favourite_ids(*favourite_user_ids)
         except Exception as e:
             db.session.rollback()
             deletion_summary['errors'].append(
@@ -377,26 +1074,24 @@ def delete_place_and_related_data(place_id: str) -> dict:
 
         # 5. Clear all related cache entries
         try:
-            redis = get_redis()
-
-            # Clear cache for all place types
+            # Place lists are versioned, so they are dropped by bumping
+            # the versions rather than scanning for them
+            for namespace in ('hotels', 'restaurants', 'things-to-do'):
+                bump_cache_version(namespace)
             cache_patterns = [
-                'hotels:*',
-                'restaurants:*',
-                'things-to-do:*',
-                f'hotels:{place_id}',
-                f'restaurants:{place_id}',
-                f'things-to-do:{place_id}',
                 'reviews:*',
                 'recommendations:*',
             ]
 
             total_keys_deleted = 0
             for pattern in cache_patterns:
-                keys_to_delete = redis.keys(pattern)
-                if keys_to_delete:
-                    redis.delete(*keys_to_delete)
-                    total_keys_deleted += len(keys_to_delete)
+                total_keys_deleted += purge_cache(pattern)
+            total_keys_deleted += get_redis().unlink(
+                f'hotels:{place_id}',
+                f'restaurants:{place_id}',
+                f'things-to-do:{place_id}',
+                f'place_details:{place_id}',
+            )
 
             deletion_summary['cache_cleared'] = True
             logger.info(
@@ -463,7 +1158,7 @@ def get_all_subtypes():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -477,7 +1172,7 @@ def get_all_subtypes():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -497,7 +1192,7 @@ def get_all_subcategories():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -509,7 +1204,7 @@ def get_all_subcategories():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -529,7 +1224,7 @@ def get_all_cuisines():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -543,7 +1238,7 @@ def get_all_cuisines():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -563,7 +1258,7 @@ def get_all_meal_types():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -577,7 +1272,7 @@ def get_all_meal_types():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -597,7 +1292,7 @@ def get_all_restaurant_features():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -610,7 +1305,7 @@ def get_all_restaurant_features():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -630,7 +1325,7 @@ def get_all_dietary_restrictions():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -648,7 +1343,7 @@ def get_all_dietary_restrictions():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -668,7 +1363,7 @@ def get_all_dishes():
         cached_data = redis.get(cache_key)
         if cached_data:
             logger.info(f'Cache hit for {cache_key}.')
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for {cache_key}: {e}')
 
@@ -685,7 +1380,7 @@ def get_all_dishes():
 
         if redis:
             try:
-                redis.setex(cache_key, 86400, json.dumps(data))  # 24 hours
+                redis.setex(cache_key, 86400, orjson.dumps(data))  # 24 hours
                 logger.info(f'Successfully cached {cache_key}.')
             except Exception as e:
                 logger.warning(f'Redis cache SET failed for {cache_key}: {e}')
@@ -705,7 +1400,7 @@ def get_all_hotel_features():
         cached_features = redis.get(cache_key)
         if cached_features:
             logger.info('Cache hit for all hotel features.')
-            return json.loads(cached_features)
+            return orjson.loads(cached_features)
     except Exception as e:
         logger.warning(f'Redis cache GET failed for hotel features: {e}')
 
@@ -718,7 +1413,7 @@ def get_all_hotel_features():
         if redis:
             try:
                 # Cache for 24 hours
-                redis.setex(cache_key, 86400, json.dumps(features))
+                redis.setex(cache_key, 86400, orjson.dumps(features))
                 logger.info('Successfully cached all hotel features.')
             except Exception as e:
                 logger.warning(
@@ -733,10 +1428,12 @@ def get_all_hotel_features():
 
 def add_price_fields_to_neo4j_hotels():
     """
-    One-time utility function to extract min_price and max_price from price_range
-    strings and add them as properties to Hotel nodes in Neo4j.
+    Extract min_price and max_price from price_range strings and add them
+    as properties to Hotel nodes in Neo4j.
 
-    This should be run once to migrate existing data.
+    Only hotels still missing min_price are touched, so this can be run
+    again safely and migrates hotels written before the bounds were stored
+    on create.
     """
 
     def extract_price_from_string(price_range_str):
@@ -762,43 +1459,42 @@ def add_price_fields_to_neo4j_hotels():
         return None, None
 
     try:
-        # Get all hotels with price_range
+        # Get the hotels with a price_range but no price bounds yet
         hotels = execute_neo4j_query(
             """
             MATCH (h:Hotel)
-            WHERE h.price_range IS NOT NULL
+            WHERE h.price_range IS NOT NULL AND h.min_price IS NULL
             RETURN elementId(h) AS hotel_id, h.price_range AS price_range
             """,
             {},
         )
 
-        updated_count = 0
-        error_count = 0
-
+        rows = []
         for hotel in hotels:
-            hotel_id = hotel['hotel_id']
-            price_range = hotel['price_range']
-
-            min_price, max_price = extract_price_from_string(price_range)
-
-            try:
-                # Update hotel with min_price and max_price
-                execute_neo4j_query(
-                    """
-                    MATCH (h:Hotel)
-                    WHERE elementId(h) = $hotel_id
-                    SET h.min_price = $min_price, h.max_price = $max_price
-                    """,
+            min_price, max_price = extract_price_from_string(
+                hotel['price_range']
+            )
+            if min_price is not None:
+                rows.append(
                     {
-                        'hotel_id': hotel_id,
+                        'hotel_id': hotel['hotel_id'],
                         'min_price': min_price,
                         'max_price': max_price,
-                    },
+                    }
                 )
-                updated_count += 1
-            except Exception:
-                error_count += 1
 
-        return {'updated': updated_count, 'errors': error_count}
+        # Update every hotel in a single query
+        if rows:
+            execute_neo4j_query(
+                """
+                UNWIND $rows AS row
+                MATCH (h:Hotel)
+                WHERE elementId(h) = row.hotel_id
+                SET h.min_price = row.min_price, h.max_price = row.max_price
+                """,
+                {'rows': rows},
+            )
+
+        return {'updated': len(rows), 'errors': len(hotels) - len(rows)}
     except Exception as e:
         return {'error': str(e)}